@@ -1,8 +1,10 @@
+import os
 import json
 import re
+import time
 import random
 import requests
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Set
 import nltk
 from nltk.tokenize import sent_tokenize, word_tokenize
 from nltk.corpus import stopwords
@@ -24,16 +26,280 @@ try:
 except:
     NLTK_AVAILABLE = False
 
+try:
+    import minhash
+    MINHASH_AVAILABLE = True
+except ImportError:
+    MINHASH_AVAILABLE = False
+
+try:
+    import gazetteer
+    GAZETTEER_AVAILABLE = True
+except ImportError:
+    GAZETTEER_AVAILABLE = False
+
+_phrase_matcher = None
+
+
+def get_phrase_matcher():
+    """Shared matcher over the built gazetteer, or None if it is unavailable."""
+    global _phrase_matcher, GAZETTEER_AVAILABLE
+    if _phrase_matcher is None and GAZETTEER_AVAILABLE:
+        try:
+            _phrase_matcher = gazetteer.PhraseMatcher()
+        except Exception as e:
+            print(f"Phrase gazetteer not loaded: {e}")
+            GAZETTEER_AVAILABLE = False
+    return _phrase_matcher
+
+MAX_QUESTIONS = 10
+# Characters split per step while preprocessing, between deadline checks
+PREPROCESS_CHUNK_CHARS = 50000
+# Share of the remaining budget preprocessing may use; the rest is kept for generation
+PREPROCESS_BUDGET_SHARE = 0.6
+# Top-ranked sentences tried even when the deadline has already passed
+MIN_ATTEMPTS = 3
+# Sentences scored per step while ranking, between deadline checks
+RANK_BATCH = 2048
+
+DOMAIN_TERMS = ['learning', 'algorithm', 'data', 'model', 'network',
+                'intelligence', 'system', 'training', 'prediction',
+                'classification', 'regression', 'clustering',
+                'supervised', 'unsupervised', 'neural', 'deep',
+                'machine', 'artificial', 'computer', 'science',
+                'technology']
+# Matched against lowercased text; IGNORECASE makes the alternation about twice as slow
+DOMAIN_TERM_RE = re.compile(r'\b(?:' + '|'.join(DOMAIN_TERMS) + r')\b')
+CAPITALIZED_RE = re.compile(r'\s[A-Z][a-z]+')
+WHITESPACE_RE = re.compile(r'\s+')
+CITATION_RE = re.compile(r'\[[0-9]+\]')
+EDITORIAL_NOTE_RE = re.compile(r'\[[a-z_ ]*\]')
+SENTENCE_END_RE = re.compile(r'[.!?]\s')
+
+############################################################
+# NLP engine tiers
+############################################################
+# Extra domain vocabularies for the fast tier, selectable by name
+VOCABULARIES = {
+    'ml': DOMAIN_TERMS,
+}
+DEFAULT_VOCABULARIES = ('ml',)
+# Merged term sets per combination of vocabulary names, rebuilt after registration
+_vocabulary_sets = {}
+
+
+def register_vocabulary(name: str, terms: Iterable[str]):
+    VOCABULARIES[name] = [t.lower() for t in terms]
+    _vocabulary_sets.clear()
+
+
+def load_vocabulary(path: str) -> List[str]:
+    """One term per line; blank lines and ``#`` comments are ignored."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip().lower() for line in f if line.strip() and not line.startswith('#')]
+
+
+def load_vocabulary_dir(directory: str) -> List[str]:
+    """Register every ``<name>.txt`` in ``directory`` as vocabulary ``name``."""
+    names = []
+    if os.path.isdir(directory):
+        for filename in sorted(os.listdir(directory)):
+            name, ext = os.path.splitext(filename)
+            if ext == '.txt':
+                register_vocabulary(name, load_vocabulary(os.path.join(directory, filename)))
+                names.append(name)
+    return names
+
+
+def vocabulary_set(names: Iterable[str]) -> frozenset:
+    """Union of the named vocabularies as currently registered."""
+    key = tuple(names)
+    terms = _vocabulary_sets.get(key)
+    if terms is None:
+        terms = frozenset(t for name in key for t in VOCABULARIES.get(name, []))
+        _vocabulary_sets[key] = terms
+    return terms
+
+
+class FastEngine:
+    """
+    Regex tier: punctuation sentence split and capitalised/vocabulary terms
+    """
+    name = 'fast'
+    SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+    WORD_RE = re.compile(r'\b[A-Za-z]+\b')
+
+    def __init__(self, vocabularies: Iterable[str] = DEFAULT_VOCABULARIES):
+        self.vocabularies = tuple(vocabularies)
+
+    @property
+    def vocabulary(self) -> frozenset:
+        # Resolved on use, so vocabularies registered after start-up apply
+        return vocabulary_set(self.vocabularies)
+
+    def available(self) -> bool:
+        return True
+
+    def split_sentences(self, text: str) -> List[str]:
+        sentences = self.SENTENCE_SPLIT_RE.split(text)
+        return [s.strip() for s in sentences if len(s.strip()) > 10]
+
+    def extract_terms(self, sentence: str, stopwords_set: Set[str]) -> List[str]:
+        vocabulary = self.vocabulary
+        key_terms = []
+        for word in self.WORD_RE.findall(sentence):
+            word_lower = word.lower()
+            if (len(word) > 3 and
+                word_lower not in stopwords_set and
+                (word[0].isupper() or word_lower in vocabulary)):
+                key_terms.append(word)
+        return key_terms
+
+
+class AccurateEngine:
+    """
+    NLTK tier: Punkt sentence split and POS-tagged noun/adjective/verb terms
+    """
+    name = 'accurate'
+    NON_WORD_RE = re.compile(r'[^\w]')
+
+    def __init__(self, fallback: FastEngine = None, vocabularies: Iterable[str] = DEFAULT_VOCABULARIES):
+        self.fallback = fallback or FastEngine(vocabularies)
+        self.vocabularies = self.fallback.vocabularies
+        self._available = None
+
+    def available(self) -> bool:
+        if self._available is None:
+            try:
+                nltk.data.find('tokenizers/punkt')
+                nltk.data.find('taggers/averaged_perceptron_tagger')
+                self._available = NLTK_AVAILABLE
+            except LookupError:
+                self._available = False
+        return self._available
+
+    def split_sentences(self, text: str) -> List[str]:
+        if not self.available():
+            return self.fallback.split_sentences(text)
+        try:
+            return sent_tokenize(text)
+        except Exception:
+            return self.fallback.split_sentences(text)
+
+    def extract_terms(self, sentence: str, stopwords_set: Set[str]) -> List[str]:
+        if not self.available():
+            return self.fallback.extract_terms(sentence, stopwords_set)
+        try:
+            key_terms = []
+            for word, pos in pos_tag(word_tokenize(sentence)):
+                word_clean = self.NON_WORD_RE.sub('', word)
+                if (word_clean and
+                    word_clean.lower() not in stopwords_set and
+                    len(word_clean) > 2 and
+                    (pos.startswith('NN') or pos.startswith('JJ') or pos.startswith('VB'))):
+                    key_terms.append(word_clean)
+            return key_terms
+        except Exception:
+            return self.fallback.extract_terms(sentence, stopwords_set)
+
+
+ENGINES = {
+    'fast': FastEngine(),
+    'accurate': AccurateEngine(),
+}
+ENGINE_CLASSES = {
+    'fast': FastEngine,
+    'accurate': AccurateEngine,
+}
+# Engines for non-default vocabulary selections, built on first use
+_vocabulary_engines = {}
+
+# Throughput of the accurate tier used to predict whether it fits a budget;
+# measure with engine_report.py and adjust for the deployment hardware
+ACCURATE_CHARS_PER_SECOND = 250000
+ACCURATE_MAX_CHARS = 2000000
+# Fraction of the remaining budget the accurate tier may use for preprocessing
+ACCURATE_BUDGET_SHARE = 0.5
+
+
+def _engine_for(name: str, vocabularies: Iterable[str] = None):
+    vocabularies = tuple(vocabularies) if vocabularies else DEFAULT_VOCABULARIES
+    if vocabularies == DEFAULT_VOCABULARIES:
+        return ENGINES[name]
+    key = (name, vocabularies)
+    if key not in _vocabulary_engines:
+        _vocabulary_engines[key] = ENGINE_CLASSES[name](vocabularies=vocabularies)
+    return _vocabulary_engines[key]
+
+
+def get_engine(name: str = None, vocabularies: Iterable[str] = None):
+    """
+    Engine by name using the given vocabularies (default ``('ml',)``);
+    unknown or unavailable tiers fall back to the fast tier.
+    """
+    if name is None:
+        name = 'accurate'
+    engine = _engine_for(name if name in ENGINES else 'fast', vocabularies)
+    return engine if engine.available() else _engine_for('fast', vocabularies)
+
+
+def select_engine(text_length: int, budget: float = None, vocabularies: Iterable[str] = None):
+    """
+    Pick a tier for a document of ``text_length`` characters given the
+    remaining time ``budget`` in seconds (None means unbounded).
+    """
+    if text_length > ACCURATE_MAX_CHARS:
+        return _engine_for('fast', vocabularies)
+    if budget is not None and text_length / ACCURATE_CHARS_PER_SECOND > budget * ACCURATE_BUDGET_SHARE:
+        return _engine_for('fast', vocabularies)
+    return get_engine('accurate', vocabularies)
+
+
+CONCEPTUAL_TEMPLATES = [
+    "What concept is primarily discussed in this context?",
+    "Which term best describes the main topic?",
+    "What is the key concept mentioned?",
+    "Which of the following is the main focus?"
+]
+
+
+def question_dedup_text(question: Dict[str, Any]) -> str:
+    """Text used to compare questions: template questions differ only by answer."""
+    if question.get("Question") in CONCEPTUAL_TEMPLATES:
+        return "concept: " + str(question.get("Answer", ""))
+    return question.get("Question", "")
+
+
+def near_duplicate_indices(texts: List[str], threshold: float = 0.7, deadline: float = None) -> List[int]:
+    """
+    Indices of texts to keep after near-duplicate removal (exact match without
+    NumPy). Texts not reached by ``deadline`` are kept unchecked.
+    """
+    if MINHASH_AVAILABLE:
+        return minhash.dedup_indices(texts, threshold, deadline=deadline)
+    seen = set()
+    kept = []
+    for i, text in enumerate(texts):
+        if text not in seen:
+            seen.add(text)
+            kept.append(i)
+    return kept
+
 
 class Aqua:
     """
     Question generator class
     """
 
-    def __init__(self, text: str):
+    def __init__(self, text: str, sentences: List[str] = None, deadline: float = None,
+                 engine=None):
         self.text = text if text else ""
+        self.engine = engine or get_engine()
         self.sentences = []
         self.questions = []
+        # Absolute time.monotonic() deadline; None means no limit
+        self.deadline = deadline
+        self.complete = True
         self.stopwords_set = set(
             ['a', 'an', 'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to',
              'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be',
@@ -46,78 +312,107 @@ class Aqua:
             except:
                 pass
 
-        self.preprocess_text()
+        # Sentences from an earlier analysis of the same text skip preprocessing
+        if sentences is not None:
+            self.sentences = list(sentences)
+        else:
+            self.preprocess_text()
 
     def preprocess_text(self):
         """Clean and split text into meaningful sentences"""
         if not self.text:
             return
 
-        cleaned_text = self.text
-        cleaned_text = re.sub(r'\s+', ' ', cleaned_text)
-        cleaned_text = re.sub(r'\[[0-9]+\]', '', cleaned_text)
-        cleaned_text = re.sub(r'\[[a-z_ ]*\]', '', cleaned_text)
-        cleaned_text = cleaned_text.strip()
-
-        if NLTK_AVAILABLE:
-            try:
-                sentences = sent_tokenize(cleaned_text)
-            except:
-                sentences = self.simple_sentence_split(cleaned_text)
-        else:
-            sentences = self.simple_sentence_split(cleaned_text)
-
+        # Clean and split in sentence-aligned chunks so a long document can
+        # stop early and leave time for generation; the first chunk is always processed
+        stop_at = self._budget_deadline(PREPROCESS_BUDGET_SHARE)
         self.sentences = []
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if (30 <= len(sentence) <= 400 and 
-                not sentence.startswith('See also') and
-                not sentence.startswith('External links') and
-                '=' not in sentence and
-                sentence.count('.') <= 3):
-                self.sentences.append(sentence)
+        start = 0
+        while start < len(self.text):
+            if start and stop_at is not None and time.monotonic() >= stop_at:
+                self.complete = False
+                break
+            end = self._chunk_end(self.text, start)
+            cleaned_text = self.text[start:end]
+            cleaned_text = WHITESPACE_RE.sub(' ', cleaned_text)
+            cleaned_text = CITATION_RE.sub('', cleaned_text)
+            cleaned_text = EDITORIAL_NOTE_RE.sub('', cleaned_text)
+            cleaned_text = cleaned_text.strip()
+
+            for sentence in self.engine.split_sentences(cleaned_text):
+                sentence = sentence.strip()
+                if (30 <= len(sentence) <= 400 and 
+                    not sentence.startswith('See also') and
+                    not sentence.startswith('External links') and
+                    '=' not in sentence and
+                    sentence.count('.') <= 3):
+                    self.sentences.append(sentence)
+            start = end
+
+        # Articles and lecture notes repeat near-identical sentences
+        keep = near_duplicate_indices(self.sentences, deadline=stop_at)
+        self.sentences = [self.sentences[i] for i in keep]
+        if stop_at is not None and time.monotonic() >= stop_at:
+            self.complete = False
+
+    def _budget_deadline(self, share: float):
+        """Time by which ``share`` of the remaining budget is used up (None without a deadline)."""
+        if self.deadline is None:
+            return None
+        now = time.monotonic()
+        return now + max(0.0, self.deadline - now) * share
+
+    @staticmethod
+    def _chunk_end(text: str, start: int) -> int:
+        """End of the chunk starting at ``start``, just after a sentence end where possible."""
+        end = start + PREPROCESS_CHUNK_CHARS
+        if end >= len(text):
+            return len(text)
+        cut = None
+        for m in SENTENCE_END_RE.finditer(text, start + PREPROCESS_CHUNK_CHARS // 2, end):
+            cut = m.end()
+        return cut or end
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def score_sentence(self, sentence: str) -> float:
+        """Cheap estimate of how good a question the sentence will make."""
+        score = 2.0 * len(DOMAIN_TERM_RE.findall(sentence.lower()))
+        score += len(CAPITALIZED_RE.findall(sentence))
+        score -= abs(len(sentence) - 140) / 100.0
+        return score
+
+    def rank_sentences(self) -> List[str]:
+        """
+        Sentences best-first by ``score_sentence``. Scoring stops after a share
+        of the remaining budget; unscored sentences follow in document order.
+        """
+        stop_at = self._budget_deadline(PREPROCESS_BUDGET_SHARE)
+        scored = []
+        start = 0
+        while start < len(self.sentences):
+            if start and stop_at is not None and time.monotonic() >= stop_at:
+                break
+            batch = self.sentences[start:start + RANK_BATCH]
+            scored.extend((self.score_sentence(sentence), i) for i, sentence in enumerate(batch, start))
+            start += len(batch)
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [self.sentences[i] for _, i in scored] + self.sentences[start:]
 
     def simple_sentence_split(self, text: str) -> List[str]:
-        sentences = re.split(r'[.!?]+', text)
-        return [s.strip() for s in sentences if len(s.strip()) > 10]
+        return ENGINES['fast'].split_sentences(text)
 
     def extract_key_terms(self, sentence: str) -> List[str]:
-        key_terms = []
-        if NLTK_AVAILABLE:
-            try:
-                words = word_tokenize(sentence)
-                pos_tags = pos_tag(words)
-                for word, pos in pos_tags:
-                    word_clean = re.sub(r'[^\w]', '', word)
-                    if (word_clean and 
-                        word_clean.lower() not in self.stopwords_set and
-                        len(word_clean) > 2 and
-                        (pos.startswith('NN') or pos.startswith('JJ') or pos.startswith('VB'))):
-                        key_terms.append(word_clean)
-            except:
-                key_terms = self.simple_key_extraction(sentence)
-        else:
-            key_terms = self.simple_key_extraction(sentence)
-
-        key_terms = list(dict.fromkeys(key_terms))
+        # Known multi-word terms come first so they are preferred as answers
+        matcher = get_phrase_matcher()
+        phrases = matcher.longest_matches(sentence) if matcher else []
+        key_terms = self.engine.extract_terms(sentence, self.stopwords_set)
+        key_terms = list(dict.fromkeys(phrases + key_terms))
         return key_terms[:5]
 
     def simple_key_extraction(self, sentence: str) -> List[str]:
-        words = re.findall(r'\b[A-Za-z]+\b', sentence)
-        key_terms = []
-        for word in words:
-            word_lower = word.lower()
-            if (len(word) > 3 and 
-                word_lower not in self.stopwords_set and
-                (word[0].isupper() or 
-                 word_lower in ['learning', 'algorithm', 'data', 'model', 'network', 
-                                'intelligence', 'system', 'training', 'prediction', 
-                                'classification', 'regression', 'clustering', 
-                                'supervised', 'unsupervised', 'neural', 'deep',
-                                'machine', 'artificial', 'computer', 'science', 
-                                'technology'])):
-                key_terms.append(word)
-        return key_terms
+        return ENGINES['fast'].extract_terms(sentence, self.stopwords_set)
 
     def generate_options(self, correct_answer: str, context: str = "") -> List[str]:
         ml_terms = [
@@ -145,15 +440,13 @@ class Aqua:
         all_terms = ml_terms + ai_terms
         options = [correct_answer]
 
-        if ' ' in correct_answer:
-            words = correct_answer.split()
-            if len(words) >= 2:
-                options.append(words[0])
-                options.append(' '.join(words[1:]))
-
-        relevant_terms = [term for term in all_terms if term.lower() != correct_answer.lower()]
+        # Parts of a phrase answer ("linear regression" for "multiple linear
+        # regression") would also fit the blank, so they are never distractors
+        answer = correct_answer.lower()
+        relevant_terms = [term for term in dict.fromkeys(all_terms)
+                          if term.lower() not in answer and answer not in term.lower()]
         random.shuffle(relevant_terms)
-        options.extend(relevant_terms[:2])
+        options.extend(relevant_terms[:3 if ' ' in correct_answer else 2])
 
         options = list(dict.fromkeys(options))
         while len(options) < 4:
@@ -181,13 +474,7 @@ class Aqua:
         if not key_terms:
             return None
 
-        templates = [
-            "What concept is primarily discussed in this context?",
-            "Which term best describes the main topic?",
-            "What is the key concept mentioned?",
-            "Which of the following is the main focus?"
-        ]
-        question_text = random.choice(templates)
+        question_text = random.choice(CONCEPTUAL_TEMPLATES)
         correct_answer = key_terms[0]
 
         options = self.generate_options(correct_answer, sentence)
@@ -233,40 +520,52 @@ class Aqua:
         ]
         return random.sample(fallback, min(6, len(fallback)))
 
-    def finalQuestions(self) -> str:
+    def finalQuestions(self, deadline: float = None) -> str:
+        """
+        Generate the quiz as JSON. With a deadline, sentences are tried
+        best-first and generation stops at the deadline, returning what was
+        built so far (topped up with fallbacks) with ``"complete": false``.
+        """
+        if deadline is not None:
+            self.deadline = deadline
         try:
             self.questions = []
 
             if self.sentences:
-                num_sentences = min(10, len(self.sentences))  
-                selected = random.sample(self.sentences, num_sentences)
-
-                for sentence in selected:
-                    question = self.create_fill_in_blank_question(sentence)
+                pool = self.rank_sentences()
+
+                keys = []
+                for attempt, sentence in enumerate(pool):
+                    if len(self.questions) >= MAX_QUESTIONS:
+                        break
+                    # Past the deadline, still try a few top sentences rather than return only fallbacks
+                    if self.expired():
+                        self.complete = False
+                        if attempt >= MIN_ATTEMPTS:
+                            break
+                    question = (self.create_fill_in_blank_question(sentence) or
+                                self.create_conceptual_question(sentence))
                     if not question:
-                        question = self.create_conceptual_question(sentence)
-                    if question:
-                        self.questions.append(question)
-
-                unique = []
-                seen = set()
-                for q in self.questions:
-                    if q["Question"] not in seen:
-                        unique.append(q)
-                        seen.add(q["Question"])
-                self.questions = unique
+                        continue
+                    # Drop near-duplicates as they come, so the slot goes to the next sentence
+                    key = question_dedup_text(question)
+                    if len(near_duplicate_indices(keys + [key])) <= len(keys):
+                        continue
+                    keys.append(key)
+                    self.questions.append(question)
 
             if len(self.questions) < 5:
                 self.questions.extend(self.generate_fallback_questions())
 
-            self.questions = self.questions[:10]  
+            self.questions = self.questions[:MAX_QUESTIONS]
 
-            result = {"quiz": self.questions}
+            result = {"quiz": self.questions, "complete": self.complete}
             return json.dumps(result, indent=2, ensure_ascii=False)
 
         except Exception as e:
             print(f"Error in question generation: {e}")
-            result = {"quiz": self.generate_fallback_questions()}
+            self.complete = False
+            result = {"quiz": self.generate_fallback_questions(), "complete": False}
             return json.dumps(result, indent=2, ensure_ascii=False)
 
 
@@ -275,8 +574,14 @@ class QuestionGenerator(Aqua):
     pass
 
 
-def generate_questions_from_text(text: str) -> str:
-    generator = Aqua(text)
+def generate_questions_from_text(text: str, time_budget: float = None, engine: str = None,
+                                 vocabularies: Iterable[str] = None) -> str:
+    deadline = time.monotonic() + time_budget if time_budget is not None else None
+    if engine:
+        selected = get_engine(engine, vocabularies)
+    else:
+        selected = select_engine(len(text), time_budget, vocabularies)
+    generator = Aqua(text, deadline=deadline, engine=selected)
     return generator.finalQuestions()
 
 
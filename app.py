@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, abort, Response, send_file, g
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import (
@@ -10,15 +10,23 @@ from flask_login import (
     current_user,
 )
 import os
-import io
+import time
+import tempfile
 import re
 import json
 import requests
 from bs4 import BeautifulSoup
-from random import shuffle
+from random import shuffle, randrange
 from werkzeug.utils import secure_filename
 import PyPDF2
 
+from docstore import DocumentStore, hash_stream
+from profiler import RequestProfiler
+import itemstats
+import variants
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+
 try:
     import GenerateQuestion as GenQ
 except Exception as e:
@@ -28,7 +36,7 @@ except Exception as e:
 # Flask + DB setup
 ############################################################
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///iqgenerator.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///iqgenerator.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = 'your_secret_key_change_in_production'
 
@@ -38,6 +46,35 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16 MB
 
+# Per-request time budget; keep below the gunicorn worker timeout
+app.config['REQUEST_DEADLINE_SECONDS'] = float(os.environ.get('REQUEST_DEADLINE_SECONDS', '25'))
+# Time kept back from generation for rendering the response
+app.config['RENDER_RESERVE_SECONDS'] = 0.5
+# Share of the generation budget PDF text extraction may use before it stops at a page boundary
+app.config['EXTRACT_BUDGET_SHARE'] = 0.5
+
+# NLP tier: 'auto' picks by document size and remaining budget, or force 'fast' / 'accurate'
+app.config['NLP_ENGINE'] = os.environ.get('NLP_ENGINE', 'auto')
+# Fast-tier vocabularies, comma separated; <name>.txt files in NLP_VOCABULARY_DIR are registered at start-up
+app.config['NLP_VOCABULARIES'] = os.environ.get('NLP_VOCABULARIES', 'ml')
+app.config['NLP_VOCABULARY_DIR'] = os.environ.get('NLP_VOCABULARY_DIR', os.path.join(app.root_path, 'data', 'vocabularies'))
+if GenQ and hasattr(GenQ, 'load_vocabulary_dir'):
+    GenQ.load_vocabulary_dir(app.config['NLP_VOCABULARY_DIR'])
+
+# Content-addressed cache of extracted upload text
+app.config['DOC_STORE_DIR'] = os.path.join(app.instance_path, 'docstore')
+app.config['DOC_STORE_MAX_BYTES'] = 64 * 1024 * 1024  # 64 MB
+doc_store = DocumentStore(app.config['DOC_STORE_DIR'], app.config['DOC_STORE_MAX_BYTES'])
+
+# Opt-in request profiling (see profiler.py)
+app.config['PROFILER_ENABLED'] = os.environ.get('PROFILER_ENABLED', '0') == '1'
+app.config['PROFILER_SAMPLE_RATE'] = float(os.environ.get('PROFILER_SAMPLE_RATE', '0.01'))
+app.config['PROFILER_SLOW_MS'] = float(os.environ.get('PROFILER_SLOW_MS', '1000'))
+app.config['PROFILER_MAX_PROFILES'] = 20
+# Signs admin tokens; without it tokens are ignored and /admin/profiles* is closed
+app.config['PROFILER_SECRET'] = os.environ.get('PROFILER_SECRET')
+profiler = RequestProfiler(app)
+
 # Initialize DB
 db = SQLAlchemy(app)
 
@@ -65,6 +102,44 @@ class QuizResult(db.Model):
 
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
 
+class AnswerLog(db.Model):
+    """One row per answered question; written in bulk when a quiz is graded."""
+    id = db.Column(db.Integer, primary_key=True)
+    question_hash = db.Column(db.String(40), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    quiz_result_id = db.Column(db.Integer, db.ForeignKey('quiz_result.id'))
+    correct = db.Column(db.Boolean, nullable=False)
+    time_ms = db.Column(db.Integer)
+
+class ServedQuiz(db.Model):
+    """Last quiz served to each user; /Result grades and /Variants exports it."""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    questions = db.Column(db.JSON, nullable=False)
+
+class ItemStat(db.Model):
+    """Running sums per question, updated incrementally (see itemstats.py)."""
+    question_hash = db.Column(db.String(40), primary_key=True)
+    question = db.Column(db.Text, nullable=False)
+    answer = db.Column(db.String(500), nullable=False)
+    options = db.Column(db.JSON, nullable=False)
+    exposures = db.Column(db.Integer, nullable=False, default=0)
+    correct = db.Column(db.Integer, nullable=False, default=0)
+    sum_score = db.Column(db.Float, nullable=False, default=0.0)
+    sum_score_sq = db.Column(db.Float, nullable=False, default=0.0)
+    sum_correct_score = db.Column(db.Float, nullable=False, default=0.0)
+
+    @property
+    def difficulty(self):
+        return itemstats.difficulty(self.exposures, self.correct)
+
+    @property
+    def discrimination(self):
+        return itemstats.discrimination(self.exposures, self.correct, self.sum_score,
+                                        self.sum_score_sq, self.sum_correct_score)
+
+    def as_question(self):
+        return {"Question": self.question, "Options": list(self.options), "Answer": self.answer}
+
 # Database initialization
 def init_database():
     """Initialize database with proper schema"""
@@ -77,6 +152,23 @@ def init_database():
 
 init_database()
 
+@app.before_request
+def _start_request_deadline():
+    g.request_deadline = time.monotonic() + app.config['REQUEST_DEADLINE_SECONDS']
+
+@app.after_request
+def _report_quiz_completeness(response):
+    if 'quiz_complete' in g:
+        response.headers['X-Quiz-Complete'] = '1' if g.quiz_complete else '0'
+    return response
+
+def _remaining_time():
+    return max(0.0, g.request_deadline - time.monotonic())
+
+def _generation_deadline():
+    """Absolute deadline for question generation, leaving time to render."""
+    return g.request_deadline - app.config['RENDER_RESERVE_SECONDS']
+
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
@@ -218,6 +310,9 @@ def TopicContent(topic_id: str):
 ############################################################
 # Question generation from Wikipedia
 ############################################################
+# Overridable so the load-test harness can point the app at a local stub
+WIKI_BASE_URL = os.environ.get('WIKI_BASE_URL', 'https://en.wikipedia.org/wiki/')
+
 WIKI_HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
 }
@@ -226,8 +321,8 @@ WIKI_HEADERS = {
 @login_required
 def Questions(topic_name: str):
     try:
-        wiki_url = 'https://en.wikipedia.org/wiki/' + topic_name.replace(' ', '_')
-        r = requests.get(wiki_url, headers=WIKI_HEADERS, timeout=30)
+        wiki_url = WIKI_BASE_URL + topic_name.replace(' ', '_')
+        r = requests.get(wiki_url, headers=WIKI_HEADERS, timeout=min(30, max(1.0, _remaining_time())))
         r.raise_for_status()
         parsed = BeautifulSoup(r.text, 'html.parser')
         sample_text = ''.join([p.get_text(' ', strip=True) for p in parsed.find_all('p')])
@@ -236,13 +331,15 @@ def Questions(topic_name: str):
             flash('No readable content found on the Wikipedia page.', 'warning')
             return redirect(url_for('TopicContent', topic_id=topic_name))
             
-        questions = generate_questions(sample_text)
+        questions, complete = generate_questions(sample_text, deadline=_generation_deadline(),
+                                                 engine=_choose_engine(sample_text))
         if not questions:
             flash('Question generation failed. Showing topic content instead.', 'warning')
             return redirect(url_for('TopicContent', topic_id=topic_name))
 
         session['last_topic'] = topic_name
         _store_scraped_questions(questions)
+        _note_completeness(complete)
         return render_template('Questions.html', title='iQGenerator - Quiz', posts=questions)
         
     except Exception as e:
@@ -280,40 +377,61 @@ def uploadfile():
         return redirect(url_for('upload_file'))
 
     filename = secure_filename(f.filename)
-    file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
 
-    try:
-        f.save(file_path)
-        with open(file_path, 'rb') as pdf_file:
-            pdf_bytes = pdf_file.read()
-    finally:
+    # Hash the upload in place so identical files hit the store
+    digest, size = hash_stream(f.stream)
+    cached = doc_store.get(digest, size)
+
+    text_complete = True
+    if cached:
+        sample_text = cached.get('text', '')
+    else:
+        # Extract text, leaving part of the budget for question generation
+        sample_text = ''
+        stop_at = time.monotonic() + max(0.0, _generation_deadline() - time.monotonic()) \
+            * app.config['EXTRACT_BUDGET_SHARE']
         try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-        except Exception:
-            pass
-
-    # Extract text
-    sample_text = ''
-    try:
-        reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
-        for page in reader.pages:
-            text = page.extract_text() or ''
-            sample_text += text + ' '
-    except Exception as e:
-        print('PDF processing error:', e)
-        flash('Could not extract text from the PDF.', 'danger')
-        return redirect(url_for('upload_file'))
+            f.stream.seek(0)
+            reader = PyPDF2.PdfReader(f.stream)
+            for i, page in enumerate(reader.pages):
+                if i and time.monotonic() >= stop_at:
+                    text_complete = False
+                    break
+                text = page.extract_text() or ''
+                sample_text += text + ' '
+        except Exception as e:
+            print('PDF processing error:', e)
+            flash('Could not extract text from the PDF.', 'danger')
+            return redirect(url_for('upload_file'))
+
+    # Sentence splits differ between NLP tiers, so each tier's split is stored separately
+    engine = _choose_engine(sample_text)
+    tier = engine.name if engine is not None else 'default'
+    splits = dict((cached or {}).get('splits') or {})
+    sentences = splits.get(tier)
+    split_complete = text_complete
+    # Only the text of fully extracted documents is cached
+    store = not cached and text_complete
+    if sentences is None and sample_text.strip():
+        sentences, split_complete = analyse_text(sample_text, _generation_deadline(), engine)
+        split_complete = split_complete and text_complete
+        # A split cut short by the deadline is used for this request but not cached
+        if split_complete:
+            splits[tier] = sentences
+            store = True
+    if store:
+        doc_store.put(digest, {'text': sample_text, 'splits': splits})
 
     if not sample_text.strip():
         flash('No text extracted from the PDF.', 'warning')
         return redirect(url_for('upload_file'))
 
     try:
-        questions = generate_questions(sample_text)
+        questions, complete = generate_questions(sample_text, sentences, _generation_deadline(), engine)
+        complete = complete and split_complete
     except Exception as e:
         print('Question generation error (PDF):', e)
-        questions = []
+        questions, complete = [], False
 
     if not questions:
         flash('Question generation failed for this PDF.', 'danger')
@@ -321,31 +439,67 @@ def uploadfile():
 
     session['last_topic'] = filename or 'Uploaded PDF'
     _store_scraped_questions(questions)
+    _note_completeness(complete)
     return render_template('Questions.html', title='iQGenerator - Quiz', posts=questions)
 
+@app.route('/uploader/stats', methods=['GET'])
+@login_required
+def uploader_stats():
+    return jsonify(doc_store.stats())
+
+def _choose_engine(sample_text: str):
+    """NLP tier for this request, from config or the remaining time budget."""
+    if not GenQ or not hasattr(GenQ, 'select_engine'):
+        return None
+    choice = request.args.get('engine') or app.config['NLP_ENGINE']
+    vocabularies = _choose_vocabularies()
+    if choice in ('fast', 'accurate'):
+        return GenQ.get_engine(choice, vocabularies)
+    return GenQ.select_engine(len(sample_text), _generation_deadline() - time.monotonic(), vocabularies)
+
+def _choose_vocabularies():
+    """Registered vocabulary names from ``?vocab=`` or config, None for the default."""
+    requested = request.args.get('vocab') or app.config['NLP_VOCABULARIES']
+    names = [n.strip() for n in requested.split(',') if n.strip() in GenQ.VOCABULARIES]
+    return tuple(names) or None
+
+def _note_completeness(complete: bool):
+    g.quiz_complete = complete
+    if not complete:
+        flash('Question generation hit its time limit; showing the best questions found so far.', 'info')
+
 ############################################################
 # Results
 ############################################################
-scraped_questionSet = []
-
 def _store_scraped_questions(data):
-    global scraped_questionSet
+    """Keep the quiz as served to the current user, so any worker can grade it."""
     for q in data:
         if isinstance(q, dict) and 'Options' in q and isinstance(q['Options'], list):
             shuffle(q['Options'])
-    scraped_questionSet = data
+    try:
+        db.session.merge(ServedQuiz(user_id=current_user.id, questions=data))
+        db.session.commit()
+    except Exception as e:
+        print(f"Error storing served quiz: {e}")
+        db.session.rollback()
+
+def _served_questions():
+    """The current user's last served quiz, or an empty list."""
+    served = db.session.get(ServedQuiz, current_user.id)
+    return list(served.questions) if served else []
 
 @app.route('/Result/<data>')
 @login_required
 def Result(data: str):
-    global scraped_questionSet
-    if not scraped_questionSet:
+    questions = _served_questions()
+    if not questions:
         flash('No quiz data found. Please generate questions first.', 'warning')
         return redirect(url_for('home'))
 
     chosen = data.split(',') if data else []
-    actual = [q.get('Answer') for q in scraped_questionSet]
-    correct = sum(1 for a, b in zip(chosen, actual) if a == b)
+    actual = [q.get('Answer') for q in questions]
+    flags = [i < len(chosen) and chosen[i] == a for i, a in enumerate(actual)]
+    correct = sum(flags)
     total = len(actual) or 1
 
     result = {
@@ -366,6 +520,13 @@ def Result(data: str):
             user_id=current_user.id
         )
         db.session.add(quiz_result)
+        db.session.flush()
+        try:
+            # Savepoint: a failure here must not roll back the quiz result
+            with db.session.begin_nested():
+                _record_answers(quiz_result, questions, flags, _parse_times(request.args.get('t', '')))
+        except Exception as e:
+            print(f"Error recording answers: {e}")
         db.session.commit()
         print(f"Quiz result saved for user {current_user.username}")
     except Exception as e:
@@ -375,6 +536,181 @@ def Result(data: str):
 
     return render_template('Result.html', title='iQGenerator - Result', result=result)
 
+def _parse_times(raw: str):
+    times = []
+    for part in raw.split(','):
+        try:
+            times.append(max(0, int(float(part))))
+        except ValueError:
+            times.append(None)
+    return times
+
+# Dialect-specific INSERT constructs with on_conflict_do_update
+UPSERT_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+def _record_answers(quiz_result, questions, flags, times):
+    """Bulk-insert the answer log and upsert running item statistics."""
+    hashes = [itemstats.question_hash(q) for q in questions]
+    db.session.execute(AnswerLog.__table__.insert(), [
+        {
+            'question_hash': h,
+            'user_id': quiz_result.user_id,
+            'quiz_result_id': quiz_result.id,
+            'correct': ok,
+            'time_ms': times[i] if i < len(times) else None,
+        }
+        for i, (h, ok) in enumerate(zip(hashes, flags))
+    ])
+
+    rows = itemstats.item_increments(questions, flags, quiz_result.score / 100.0)
+    if not rows:
+        return
+    table = ItemStat.__table__
+    counters = ('exposures', 'correct', 'sum_score', 'sum_score_sq', 'sum_correct_score')
+    insert = UPSERT_INSERTS.get(db.engine.dialect.name)
+    if insert is None:
+        # No ON CONFLICT support: increment existing rows, insert the rest
+        for row in rows:
+            updated = db.session.execute(
+                table.update().where(table.c.question_hash == row['question_hash'])
+                .values({col: table.c[col] + row[col] for col in counters}))
+            if not updated.rowcount:
+                db.session.execute(table.insert(), [row])
+        return
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.question_hash],
+        set_={col: table.c[col] + stmt.excluded[col] for col in counters},
+    )
+    db.session.execute(stmt, rows)
+
+############################################################
+# Adaptive quiz
+############################################################
+ADAPTIVE_QUIZ_SIZE = 10
+# Items fetched per quiz slot, nearest the target difficulty, before dedup and ranking
+ADAPTIVE_CANDIDATE_FACTOR = 5
+
+@app.route('/AdaptiveQuiz')
+@login_required
+def AdaptiveQuiz():
+    try:
+        totals = db.session.query(func.sum(QuizResult.correct), func.sum(QuizResult.wrong)) \
+            .filter(QuizResult.user_id == current_user.id).one()
+        answered = (totals[0] or 0) + (totals[1] or 0)
+        ability = (totals[0] or 0) / answered if answered else 0.5
+
+        mastered = db.session.query(AnswerLog.question_hash) \
+            .filter(AnswerLog.user_id == current_user.id, AnswerLog.correct.is_(True))
+        # Same smoothing as itemstats.difficulty, so the database does the coarse cut
+        target = itemstats.target_difficulty(ability)
+        distance = func.abs((ItemStat.correct + 1.0) / (ItemStat.exposures + 2) - target)
+        candidates = ItemStat.query.filter(~ItemStat.question_hash.in_(mastered)) \
+            .order_by(distance).limit(ADAPTIVE_QUIZ_SIZE * ADAPTIVE_CANDIDATE_FACTOR).all()
+        candidates.sort(key=lambda c: c.exposures, reverse=True)
+        if GenQ and hasattr(GenQ, 'near_duplicate_indices'):
+            # Keep the most exposed copy of each near-duplicate question
+            keep = GenQ.near_duplicate_indices([GenQ.question_dedup_text(c.as_question()) for c in candidates])
+            candidates = [candidates[i] for i in keep]
+        picked = itemstats.pick_adaptive(candidates, ability, ADAPTIVE_QUIZ_SIZE)
+    except Exception as e:
+        print(f"Adaptive quiz error: {e}")
+        picked = []
+
+    if not picked:
+        flash('Not enough answered questions yet for an adaptive quiz. Take a few quizzes first.', 'warning')
+        return redirect(url_for('TutorialList'))
+
+    questions = [item.as_question() for item in picked]
+    session['last_topic'] = 'Adaptive Quiz'
+    _store_scraped_questions(questions)
+    return render_template('Questions.html', title='iQGenerator - Adaptive Quiz', posts=questions)
+
+############################################################
+# Exam variants
+############################################################
+@app.route('/Variants')
+@login_required
+def Variants():
+    """Export N shuffled variants of the current quiz with answer keys."""
+    questions = _served_questions()
+    if not questions:
+        flash('No quiz data found. Please generate questions first.', 'warning')
+        return redirect(url_for('home'))
+
+    n = min(max(request.args.get('n', 30, type=int), 1), variants.MAX_VARIANTS)
+    seed = request.args.get('seed', type=int)
+    if seed is None:
+        seed = randrange(2 ** 31)
+    topic = session.get('last_topic', 'Quiz')
+    as_docx = request.args.get('format') == 'docx'
+    if as_docx:
+        # Rendering is the slow part; only export as many variants as fit the deadline
+        budget = _remaining_time() - app.config['RENDER_RESERVE_SECONDS']
+        limit = variants.docx_variant_limit(len(questions), budget)
+        if limit < 1:
+            flash('Not enough time left to export variants. Please try again.', 'warning')
+            return redirect(url_for('home'))
+        n = min(n, limit)
+
+    try:
+        plan = variants.VariantPlan(questions, n, seed)
+    except ValueError as e:
+        print(f"Variant generation error: {e}")
+        flash('Could not create variants for this quiz.', 'danger')
+        return redirect(url_for('home'))
+
+    name = secure_filename(topic) or 'quiz'
+    if as_docx:
+        buf = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+        variants.write_docx_zip(plan, buf, topic)
+        buf.seek(0)
+        return send_file(buf, mimetype='application/zip', as_attachment=True,
+                         download_name=f'{name}-variants-{seed}-{n}.zip')
+
+    return Response(variants.iter_json(plan), mimetype='application/json', headers={
+        'Content-Disposition': f'attachment; filename={name}-variants-{seed}.json'})
+
+############################################################
+# Admin - profiling
+############################################################
+def _require_profiler_admin():
+    if not profiler.tokens_enabled:
+        abort(404)
+    if not profiler.is_admin_request():
+        abort(403)
+
+@app.route('/admin/profiles', methods=['GET'])
+def admin_profiles():
+    _require_profiler_admin()
+    return jsonify({'enabled': profiler.enabled, 'profiles': profiler.list_profiles()})
+
+@app.route('/admin/profiles/<int:profile_id>.pstats', methods=['GET'])
+def admin_profile_pstats(profile_id: int):
+    _require_profiler_admin()
+    data = profiler.pstats_bytes(profile_id)
+    if data is None:
+        abort(404)
+    return Response(data, mimetype='application/octet-stream', headers={
+        'Content-Disposition': f'attachment; filename=profile-{profile_id}.pstats'})
+
+@app.route('/admin/profiles/<int:profile_id>.collapsed', methods=['GET'])
+def admin_profile_collapsed(profile_id: int):
+    _require_profiler_admin()
+    data = profiler.collapsed(profile_id)
+    if data is None:
+        abort(404)
+    return Response(data, mimetype='text/plain', headers={
+        'Content-Disposition': f'attachment; filename=profile-{profile_id}.collapsed.txt'})
+
+@app.cli.command('profiler-token')
+def profiler_token():
+    """Print a signed token for the X-Profile-Token header."""
+    if not profiler.tokens_enabled:
+        print('PROFILER_SECRET is not set; profiler tokens are disabled.')
+        return
+    print(profiler.make_token())
+
 ############################################################
 # Utilities
 ############################################################
@@ -418,7 +754,7 @@ def readTutorialListJson():
 def wiki_scrape_sections(page_id: str):
     """Return a list of section dictionaries from a Wikipedia page."""
     try:
-        url = 'https://en.wikipedia.org/wiki/' + page_id
+        url = WIKI_BASE_URL + page_id
         r = requests.get(url, headers=WIKI_HEADERS, timeout=30)
         r.raise_for_status()
         soup = BeautifulSoup(r.text, 'html.parser')
@@ -455,8 +791,28 @@ def wiki_scrape_sections(page_id: str):
         ],
     }]
 
-def generate_questions(sample_text: str):
-    """Use GenQ.Aqua to generate quiz questions with fallback handling."""
+def analyse_text(sample_text: str, deadline: float = None, engine=None):
+    """
+    Return ``(sentences, complete)``: the sentence split Aqua would use for
+    this text, and whether it finished before ``deadline``.
+    """
+    if not GenQ or not hasattr(GenQ, 'Aqua'):
+        return None, False
+    try:
+        aqua = GenQ.Aqua(sample_text, deadline=deadline, engine=engine)
+        return aqua.sentences, aqua.complete
+    except Exception as e:
+        print(f"Text analysis error: {e}")
+        return None, False
+
+def generate_questions(sample_text: str, sentences=None, deadline: float = None, engine=None):
+    """
+    Use GenQ.Aqua to generate quiz questions with fallback handling.
+
+    Returns ``(quiz, complete)``; ``complete`` is False when generation was
+    cut short by ``deadline`` (an absolute time.monotonic() value).
+    ``engine`` is a GenQ NLP tier; None uses the module default.
+    """
     if not GenQ or not hasattr(GenQ, 'Aqua'):
 
         return [
@@ -485,17 +841,18 @@ def generate_questions(sample_text: str):
                 "Options": ["Pattern recognition", "Data storage", "Network security", "File management"],
                 "Answer": "Pattern recognition"
             }
-        ]
+        ], True
 
     try:
-        aqua = GenQ.Aqua(sample_text)
+        aqua = GenQ.Aqua(sample_text, sentences, deadline, engine)
         json_payload = aqua.finalQuestions()
 
         try:
             data = json.loads(json_payload)
             quiz = data.get('quiz', []) if isinstance(data, dict) else []
+            complete = bool(data.get('complete', True)) if isinstance(data, dict) else False
         except Exception:
-            quiz = []
+            quiz, complete = [], False
 
         if not quiz and hasattr(aqua, 'generate_fallback_questions'):
             try:
@@ -507,7 +864,7 @@ def generate_questions(sample_text: str):
         for q in quiz:
             if isinstance(q, dict) and 'Options' in q and isinstance(q['Options'], list):
                 shuffle(q['Options'])
-        return quiz
+        return quiz, complete
         
     except Exception as e:
         print(f"Question generation error: {e}")
@@ -523,7 +880,7 @@ def generate_questions(sample_text: str):
                 "Options": ["TensorFlow", "Django", "React", "Spring"],
                 "Answer": "TensorFlow"
             }
-        ]
+        ], False
 
 ############################################################
 # Main
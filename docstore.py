@@ -0,0 +1,157 @@
+"""
+Content-addressed store for uploaded documents.
+
+Extracted text (and the sentence split produced by ``Aqua``) is kept
+zlib-compressed on disk under the SHA-256 of the uploaded bytes, so a repeat
+upload of the same file can skip PDF extraction entirely. The store is bounded
+by total size and evicts least recently used entries first. Hit, miss and
+eviction counters live next to the entries in ``stats.json`` so every worker
+process sharing the directory reports the same totals.
+"""
+import os
+import json
+import zlib
+import hashlib
+import tempfile
+import threading
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+CHUNK_SIZE = 64 * 1024
+COUNTERS = ('hits', 'misses', 'bytes_saved', 'evictions')
+
+
+def hash_stream(stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Tuple[str, int]:
+    """Hash a stream chunk by chunk, returning ``(hexdigest, size)``."""
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+
+class DocumentStore:
+    """
+    Disk-backed, size-bounded store keyed by content hash
+    """
+
+    def __init__(self, root: str, max_bytes: int = 64 * 1024 * 1024, level: int = 6):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.level = level
+        self.lock = threading.Lock()
+        self.stats_path = os.path.join(root, 'stats.json')
+        self.lock_path = os.path.join(root, 'stats.lock')
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest + '.json.z')
+
+    def _read_counters(self) -> Dict[str, int]:
+        try:
+            with open(self.stats_path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            stored = {}
+        return {name: int(stored.get(name, 0)) for name in COUNTERS}
+
+    def _bump(self, **deltas: int):
+        """Add ``deltas`` to the shared counters, locked across threads and processes."""
+        with self.lock:
+            try:
+                with open(self.lock_path, 'a') as lock_file:
+                    if FCNTL_AVAILABLE:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    counters = self._read_counters()
+                    for name, delta in deltas.items():
+                        counters[name] += delta
+                    fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        json.dump(counters, f)
+                    os.replace(tmp_path, self.stats_path)
+            except OSError as e:
+                print(f"Document store stats error: {e}")
+
+    def get(self, digest: str, source_size: int = 0) -> Optional[Dict[str, Any]]:
+        """Return the stored payload for ``digest`` or None, updating counters."""
+        path = self._path(digest)
+        try:
+            with open(path, 'rb') as f:
+                payload = json.loads(zlib.decompress(f.read()).decode('utf-8'))
+            # Touch so eviction treats the entry as recently used
+            os.utime(path, None)
+        except (OSError, ValueError, zlib.error):
+            self._bump(misses=1)
+            return None
+
+        self._bump(hits=1, bytes_saved=source_size)
+        return payload
+
+    def put(self, digest: str, payload: Dict[str, Any]):
+        data = zlib.compress(json.dumps(payload, ensure_ascii=False).encode('utf-8'), self.level)
+        if len(data) > self.max_bytes:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(digest))
+        except OSError as e:
+            print(f"Document store write error: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.root):
+            if not entry.name.endswith('.json.z'):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, entry.path))
+            total += st.st_size
+
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        evicted = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                evicted += 1
+            except OSError:
+                pass
+        if evicted:
+            self._bump(evictions=evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters summed over every process using this store."""
+        # stats.json is only ever replaced whole, so no lock is needed to read it
+        counters = self._read_counters()
+        lookups = counters['hits'] + counters['misses']
+        return {
+            'hits': counters['hits'],
+            'misses': counters['misses'],
+            'hit_rate': round(counters['hits'] / lookups, 4) if lookups else 0.0,
+            'bytes_saved': counters['bytes_saved'],
+            'evictions': counters['evictions'],
+        }
@@ -0,0 +1,146 @@
+"""
+Compare the fast and accurate NLP tiers of GenerateQuestion on one corpus.
+
+Reports preprocessing and term-extraction throughput for each tier, and how
+closely the fast tier's sentences and answer candidates agree with the
+accurate tier's, so the thresholds in GenerateQuestion.select_engine can be
+set from measurements.
+
+    python engine_report.py                       # mark/*.pdf + loadtest/recordings/*.html
+    python engine_report.py notes.txt lecture.pdf --output report.json
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+
+import GenerateQuestion as GenQ
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def read_document(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.pdf':
+        import PyPDF2
+        with open(path, 'rb') as f:
+            return ' '.join(page.extract_text() or '' for page in PyPDF2.PdfReader(f).pages)
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        text = f.read()
+    if ext in ('.html', '.htm'):
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(text, 'html.parser')
+        text = ' '.join(p.get_text(' ', strip=True) for p in soup.find_all('p'))
+    return text
+
+
+def default_corpus():
+    return sorted(glob.glob(os.path.join(REPO_ROOT, 'mark', '*.pdf')) +
+                  glob.glob(os.path.join(REPO_ROOT, 'loadtest', 'recordings', '*.html')))
+
+
+def jaccard(a, b) -> float:
+    a, b = set(a), set(b)
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def measure(engine, documents, repeat):
+    """Best-of-``repeat`` preprocessing and extraction timings for one tier."""
+    chars = sum(len(d) for d in documents)
+    best_pre = best_ext = float('inf')
+    sentences, terms = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        analysed = [GenQ.Aqua(d, engine=engine) for d in documents]
+        best_pre = min(best_pre, time.perf_counter() - start)
+
+        sentences = [s for a in analysed for s in a.sentences]
+        stopwords_set = analysed[0].stopwords_set if analysed else set()
+        start = time.perf_counter()
+        terms = [engine.extract_terms(s, stopwords_set) for s in sentences]
+        best_ext = min(best_ext, time.perf_counter() - start)
+
+    return {
+        'engine': engine.name,
+        'documents': len(documents),
+        'chars': chars,
+        'sentences': len(sentences),
+        'preprocess_s': round(best_pre, 4),
+        'preprocess_chars_per_s': round(chars / best_pre) if best_pre else None,
+        'extract_s': round(best_ext, 4),
+        'extract_sentences_per_s': round(len(sentences) / best_ext) if best_ext else None,
+    }, sentences
+
+
+def agreement(fast, accurate, reference_sentences, stopwords_set):
+    """Sentence-split and answer-candidate overlap of the fast tier with the accurate tier."""
+    norm = lambda s: ' '.join(s.lower().split()).rstrip('.!?')
+    term_overlap, top_match, scored = 0.0, 0, 0
+    for sentence in reference_sentences:
+        a = [t.lower() for t in accurate.extract_terms(sentence, stopwords_set)][:5]
+        f = [t.lower() for t in fast.extract_terms(sentence, stopwords_set)][:5]
+        term_overlap += jaccard(a, f)
+        if a and f:
+            scored += 1
+            top_match += a[0] == f[0]
+    n = len(reference_sentences) or 1
+    return {
+        'term_jaccard': round(term_overlap / n, 4),
+        'top_answer_agreement': round(top_match / scored, 4) if scored else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare fast and accurate NLP tiers')
+    parser.add_argument('paths', nargs='*', help='Text, HTML or PDF documents')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default=None, help='Write the report as JSON')
+    args = parser.parse_args(argv)
+
+    paths = args.paths or default_corpus()
+    documents = [t for t in (read_document(p) for p in paths) if t.strip()]
+    if not documents:
+        print('No readable documents in the corpus.')
+        return 1
+
+    fast = GenQ.ENGINES['fast']
+    accurate = GenQ.ENGINES['accurate']
+    report = {'paths': paths, 'tiers': []}
+
+    fast_stats, fast_sentences = measure(fast, documents, args.repeat)
+    report['tiers'].append(fast_stats)
+    if accurate.available():
+        accurate_stats, accurate_sentences = measure(accurate, documents, args.repeat)
+        report['tiers'].append(accurate_stats)
+        stopwords_set = GenQ.Aqua('').stopwords_set
+        report['agreement'] = agreement(fast, accurate, accurate_sentences, stopwords_set)
+        report['agreement']['sentence_jaccard'] = round(jaccard(
+            [' '.join(s.lower().split()).rstrip('.!?') for s in fast_sentences],
+            [' '.join(s.lower().split()).rstrip('.!?') for s in accurate_sentences]), 4)
+    else:
+        report['agreement'] = None
+        print('Accurate tier unavailable (NLTK data missing); reporting the fast tier only.')
+
+    print(f"Corpus: {len(documents)} documents, {fast_stats['chars']} chars")
+    print(f"{'tier':10} {'sentences':>10} {'prep s':>8} {'chars/s':>10} {'extract s':>10} {'sent/s':>9}")
+    for t in report['tiers']:
+        print(f"{t['engine']:10} {t['sentences']:10d} {t['preprocess_s']:8.3f} "
+              f"{t['preprocess_chars_per_s'] or 0:10d} {t['extract_s']:10.3f} {t['extract_sentences_per_s'] or 0:9d}")
+    if report['agreement']:
+        a = report['agreement']
+        print(f"\nFast vs accurate: sentence Jaccard {a['sentence_jaccard']}, "
+              f"term Jaccard {a['term_jaccard']}, top-answer agreement {a['top_answer_agreement']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved report to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""
+Multi-word term gazetteer built from ``nounPhrases.txt``.
+
+``nounPhrases.txt`` is a pickled list of TextBlob ``Word`` objects. The build
+step reads it without TextBlob, keeps the multi-word phrases, and writes a
+token-level Aho-Corasick automaton as plain ``.npy`` arrays, read into
+Python lookup tables at load time:
+
+    vocab.npy        sorted ASCII token bytes; a token's id is its index
+    edge_start.npy   CSR offsets of each state's outgoing edges
+    edge_token.npy   token id of each edge, sorted within a state
+    edge_target.npy  destination state of each edge
+    fail.npy         failure link of each state
+    out_len.npy      length in tokens of the phrase ending at a state (0 = none)
+    out_link.npy     nearest state on the failure chain with an output
+
+    python gazetteer.py build nounPhrases.txt data/gazetteer
+
+``PhraseMatcher.find`` then reports every known phrase in a sentence in one
+pass over its tokens.
+"""
+import os
+import re
+import sys
+import pickle
+from collections import deque
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'gazetteer')
+
+TOKEN_RE = re.compile(r"[A-Za-z][A-Za-z'\-]*")
+NORMALIZE_RE = re.compile(r"[^a-z]")
+# Text allowed between two tokens of one phrase; anything else ends the phrase
+JOINER_RE = re.compile(r"[\s\-]*")
+SURFACE_BREAK_CHARS = set(',;:()')
+
+MIN_WORDS = 2
+MAX_WORDS = 4
+
+# Leading words that make a phrase generic rather than a domain term
+WEAK_WORDS = {
+    'a', 'an', 'the', 'and', 'or', 'of', 'in', 'on', 'to', 'for', 'with', 'by', 'as', 'at',
+    'is', 'are', 'be', 'its', 'their', 'this', 'that', 'these', 'those', 'such', 'other',
+    'certain', 'large', 'small', 'general', 'different', 'main', 'many', 'several', 'various',
+    'new', 'same', 'overall', 'comprehensive', 'use', 'more', 'most', 'some', 'few', 'first',
+    'second', 'good', 'bad', 'real', 'actual', 'basic', 'inherent', 'proper', 'high', 'low',
+    'rich', 'young', 'critical', 'numerous', 'broad',
+}
+# Third-person verb forms that end noun-phrase-chunker junk ("learning uses", "layer applies")
+VERB_TAILS = {
+    'adapts', 'affects', 'allows', 'analyzes', 'applies', 'assigns', 'assumes', 'builds',
+    'chooses', 'classifies', 'computes', 'considers', 'contains', 'converges', 'converts',
+    'corresponds', 'creates', 'demonstrates', 'denotes', 'depicts', 'describes', 'deviates',
+    'differs', 'discriminates', 'emulates', 'ensures', 'excels', 'exists', 'explores',
+    'generalizes', 'generates', 'gives', 'ignores', 'illustrates', 'implies', 'improves',
+    'includes', 'interacts', 'involves', 'learns', 'makes', 'manipulates', 'mimics',
+    'minimizes', 'needs', 'occupies', 'occurs', 'organizes', 'originates', 'penalizes',
+    'performs', 'predicts', 'proceeds', 'provides', 'reduces', 'refers', 'replicates',
+    'requires', 'restricts', 'revises', 'runs', 'satisfies', 'separates', 'shows',
+    'specifies', 'stays', 'suggests', 'takes', 'tends', 'tries', 'uses', 'varies', 'works',
+}
+# Generic heads that never make a useful answer ("rich people", "critical part")
+GENERIC_TAILS = {
+    'people', 'children', 'part', 'parts', 'way', 'ways', 'thing', 'things', 'lot', 'kind',
+    'kinds', 'example', 'examples', 'fact', 'facts', 'ones', 'matters',
+}
+# Wikipedia "[citation needed]" markers glued onto words by the scraper
+CITATION_SUFFIX = 'citation'
+ARRAYS = ('edge_start', 'edge_token', 'edge_target', 'fail', 'out_len', 'out_link')
+
+
+def normalize_token(token: str) -> str:
+    return NORMALIZE_RE.sub('', token.lower())
+
+
+############################################################
+# Build
+############################################################
+class _Word(str):
+    """Stand-in for ``textblob.blob.Word`` when unpickling."""
+
+    def __setstate__(self, state):
+        pass
+
+
+class _PhraseUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        if (module, name) == ('textblob.blob', 'Word'):
+            return _Word
+        raise pickle.UnpicklingError(f"Unexpected class in phrase list: {module}.{name}")
+
+
+def load_phrase_pickle(path: str) -> List[str]:
+    with open(path, 'rb') as f:
+        return [str(w) for w in _PhraseUnpickler(f).load()]
+
+
+def clean_phrases(phrases: Iterable[str]) -> List[Tuple[str, ...]]:
+    """Token tuples for the phrases worth matching."""
+    kept = set()
+    for phrase in phrases:
+        words = phrase.lower().split()
+        stripped = [w[:-len(CITATION_SUFFIX)] if w.endswith(CITATION_SUFFIX) else w for w in words]
+        # A citation marker inside the phrase means it spans two sentences
+        if any(a != b for a, b in zip(words[:-1], stripped[:-1])):
+            continue
+        words = stripped
+        if not MIN_WORDS <= len(words) <= MAX_WORDS:
+            continue
+        if any(not w.isalpha() or len(w) < 2 or 'displaystyle' in w for w in words):
+            continue
+        if words[0] in WEAK_WORDS or words[-1] in WEAK_WORDS:
+            continue
+        if words[-1] in VERB_TAILS or words[-1] in GENERIC_TAILS:
+            continue
+        kept.add(tuple(normalize_token(w) for w in words))
+    return sorted(kept)
+
+
+def build_automaton(phrases: Sequence[Tuple[str, ...]]) -> Dict[str, np.ndarray]:
+    vocab = sorted({w for phrase in phrases for w in phrase})
+    ids = {w: i for i, w in enumerate(vocab)}
+
+    goto = [{}]
+    out_len = [0]
+    for phrase in phrases:
+        state = 0
+        for w in phrase:
+            tid = ids[w]
+            if tid not in goto[state]:
+                goto.append({})
+                out_len.append(0)
+                goto[state][tid] = len(goto) - 1
+            state = goto[state][tid]
+        out_len[state] = max(out_len[state], len(phrase))
+
+    fail = [0] * len(goto)
+    out_link = [0] * len(goto)
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for tid, nxt in goto[state].items():
+            if state:
+                f = fail[state]
+                while f and tid not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(tid, 0)
+            out_link[nxt] = fail[nxt] if out_len[fail[nxt]] else out_link[fail[nxt]]
+            queue.append(nxt)
+
+    edge_start = [0]
+    edge_token, edge_target = [], []
+    for edges in goto:
+        for tid in sorted(edges):
+            edge_token.append(tid)
+            edge_target.append(edges[tid])
+        edge_start.append(len(edge_token))
+
+    return {
+        'vocab': np.array([w.encode('ascii') for w in vocab], dtype=bytes),
+        'edge_start': np.array(edge_start, dtype=np.int32),
+        'edge_token': np.array(edge_token, dtype=np.int32),
+        'edge_target': np.array(edge_target, dtype=np.int32),
+        'fail': np.array(fail, dtype=np.int32),
+        'out_len': np.array(out_len, dtype=np.int8),
+        'out_link': np.array(out_link, dtype=np.int32),
+    }
+
+
+def build(source: str, out_dir: str = DEFAULT_DIR) -> int:
+    phrases = clean_phrases(load_phrase_pickle(source))
+    arrays = build_automaton(phrases)
+    os.makedirs(out_dir, exist_ok=True)
+    for name, arr in arrays.items():
+        np.save(os.path.join(out_dir, name + '.npy'), arr)
+    return len(phrases)
+
+
+############################################################
+# Match
+############################################################
+class PhraseMatcher:
+    """
+    Token-level Aho-Corasick matcher over a built gazetteer directory
+    """
+
+    def __init__(self, directory: str = DEFAULT_DIR):
+        arrays = {name: np.load(os.path.join(directory, name + '.npy')) for name in ARRAYS}
+        vocab = np.load(os.path.join(directory, 'vocab.npy'))
+        # The automaton is a few hundred KB; Python containers make each step
+        # a dict lookup instead of NumPy scalar indexing on memmaps
+        self.token_ids = {token.decode('ascii'): i for i, token in enumerate(vocab.tolist())}
+        starts = arrays['edge_start'].tolist()
+        tokens = arrays['edge_token'].tolist()
+        targets = arrays['edge_target'].tolist()
+        self.goto = {}
+        for state in range(len(starts) - 1):
+            for j in range(starts[state], starts[state + 1]):
+                self.goto[state, tokens[j]] = targets[j]
+        self.fail = arrays['fail'].tolist()
+        self.out_len = arrays['out_len'].tolist()
+        self.out_link = arrays['out_link'].tolist()
+
+    def token_id(self, token: str) -> int:
+        return self.token_ids.get(token, -1)
+
+    def _step(self, state: int, tid: int) -> int:
+        while True:
+            target = self.goto.get((state, tid))
+            if target is not None:
+                return target
+            if state == 0:
+                return 0
+            state = self.fail[state]
+
+    def find(self, sentence: str) -> List[Tuple[int, int, str]]:
+        """
+        Every gazetteer phrase in ``sentence`` as ``(start, end, surface)``
+        character spans, in order of where they end.
+        """
+        spans = [m.span() for m in TOKEN_RE.finditer(sentence)]
+        matches = []
+        state = 0
+        prev_end = None
+        for i, (tok_start, end) in enumerate(spans):
+            # Punctuation between tokens breaks a phrase ("classification, regression")
+            if prev_end is not None and not JOINER_RE.fullmatch(sentence, prev_end, tok_start):
+                state = 0
+            prev_end = end
+            tid = self.token_id(normalize_token(sentence[tok_start:end]))
+            if tid < 0:
+                state = 0
+                continue
+            state = self._step(state, tid)
+            s = state if self.out_len[state] else self.out_link[state]
+            while s:
+                start = spans[i - self.out_len[s] + 1][0]
+                surface = sentence[start:end]
+                if not SURFACE_BREAK_CHARS.intersection(surface):
+                    matches.append((start, end, surface))
+                s = self.out_link[s]
+        return matches
+
+    def longest_matches(self, sentence: str) -> List[str]:
+        """Non-overlapping matches, longest first."""
+        chosen = []
+        for start, end, surface in sorted(self.find(sentence), key=lambda m: (m[0] - m[1], m[0])):
+            if all(end <= s or start >= e for s, e, _ in chosen):
+                chosen.append((start, end, surface))
+        return [surface for _, _, surface in chosen]
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) >= 2 and argv[0] == 'build':
+        out_dir = argv[2] if len(argv) > 2 else DEFAULT_DIR
+        count = build(argv[1], out_dir)
+        print(f"Built gazetteer with {count} phrases in {out_dir}")
+        return 0
+    print("Usage: python gazetteer.py build <nounPhrases.txt> [out_dir]")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
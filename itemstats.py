@@ -0,0 +1,86 @@
+"""
+Item statistics for generated questions.
+
+Each question is identified by a hash of its text and answer. Statistics are
+kept as running sums (exposures, correct answers, attempt scores) so they can
+be updated with a single increment per answer; difficulty and discrimination
+are derived from the sums on read instead of rescanning the answer log.
+"""
+import math
+import heapq
+import hashlib
+from typing import Any, Dict, Iterable, List, Sequence
+
+
+def question_hash(question: Dict[str, Any]) -> str:
+    key = (question.get('Question', '') + '\x1f' + str(question.get('Answer', ''))).encode('utf-8')
+    return hashlib.sha1(key).hexdigest()
+
+
+def difficulty(exposures: int, correct: int) -> float:
+    """Smoothed proportion correct (classical p-value); 0.5 for unseen items."""
+    return (correct + 1) / (exposures + 2)
+
+
+def discrimination(exposures: int, correct: int, sum_score: float,
+                   sum_score_sq: float, sum_correct_score: float) -> float:
+    """Point-biserial correlation between answering the item correctly and the attempt score."""
+    n = exposures
+    if n < 2:
+        return 0.0
+    var_x = n * correct - correct * correct
+    var_y = n * sum_score_sq - sum_score * sum_score
+    if var_x <= 0 or var_y <= 0:
+        return 0.0
+    return (n * sum_correct_score - correct * sum_score) / math.sqrt(var_x * var_y)
+
+
+def item_increments(questions: Sequence[Dict[str, Any]], flags: Sequence[bool], score: float) -> List[Dict[str, Any]]:
+    """
+    One increment row per graded question, ready for a bulk upsert.
+
+    ``score`` is the attempt score as a fraction (0..1) and is the criterion
+    used for discrimination.
+    """
+    rows = {}
+    for q, ok in zip(questions, flags):
+        h = question_hash(q)
+        if h in rows:
+            continue
+        rows[h] = {
+            'question_hash': h,
+            'question': q.get('Question', ''),
+            'answer': str(q.get('Answer', '')),
+            'options': list(q.get('Options', [])),
+            'exposures': 1,
+            'correct': 1 if ok else 0,
+            'sum_score': score,
+            'sum_score_sq': score * score,
+            'sum_correct_score': score if ok else 0.0,
+        }
+    return list(rows.values())
+
+
+def target_difficulty(ability: float) -> float:
+    """
+    Proportion-correct to aim for: about 0.7 for an average learner, lower
+    (harder items) as the learner's accuracy rises.
+    """
+    return min(0.9, max(0.3, 1.2 - ability))
+
+
+def pick_adaptive(candidates: Iterable[Any], ability: float, k: int = 10,
+                  exposure_weight: float = 0.02, discrimination_weight: float = 0.2) -> List[Any]:
+    """
+    Choose ``k`` items closest to the learner's target difficulty, preferring
+    discriminating and rarely shown items. ``candidates`` need
+    ``difficulty``, ``discrimination`` and ``exposures`` attributes.
+    """
+    target = target_difficulty(ability)
+
+    def cost(item):
+        return (abs(item.difficulty - target)
+                + exposure_weight * math.log1p(item.exposures)
+                - discrimination_weight * max(0.0, item.discrimination))
+
+    return heapq.nsmallest(k, candidates, key=cost)
@@ -0,0 +1,279 @@
+"""
+End-to-end load test for iQGenerator.
+
+Starts the Wikipedia stub and the Flask app under gunicorn, drives concurrent
+scripted user journeys (register -> login -> TutorialList -> TopicContent ->
+Questions -> Result) and reports p50/p95/p99 latency, throughput and error
+rate per route. Results are written as JSON so runs can be compared.
+
+    python loadtest/run.py --workers 2 --threads 4 --users 20 --duration 60
+    python loadtest/run.py --users 20 --compare loadtest/results/run-20261019-101500.json
+"""
+import os
+import math
+import sys
+import json
+import time
+import uuid
+import random
+import signal
+import argparse
+import tempfile
+import threading
+import subprocess
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import wiki_stub
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, 'loadtest', 'results')
+
+# (route label, expected status) in journey order
+JOURNEY = [
+    ('POST /register', 302),
+    ('POST /login', 302),
+    ('GET /TutorialList', 200),
+    ('GET /TopicContent/<topic_id>', 200),
+    ('GET /Questions/<topic_name>', 200),
+    ('GET /Result/<data>', 200),
+]
+
+
+def load_topics():
+    path = os.path.join(REPO_ROOT, 'static', 'json', 'tutorialList.json')
+    with open(path, 'r', encoding='utf-8') as f:
+        return [t['TopicName'] for t in json.load(f).get('Topics', [])]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = min(max(1, math.ceil(pct / 100.0 * len(sorted_values))), len(sorted_values))
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {route: [] for route, _ in JOURNEY}
+        self.journeys = 0
+
+    def add(self, route, latency, ok):
+        with self.lock:
+            self.samples[route].append((latency, ok))
+
+    def journey_done(self):
+        with self.lock:
+            self.journeys += 1
+
+    def report(self, elapsed):
+        routes = {}
+        total = errors = 0
+        for route, _ in JOURNEY:
+            samples = self.samples[route]
+            latencies = sorted(s[0] * 1000.0 for s in samples)
+            failed = sum(1 for s in samples if not s[1])
+            total += len(samples)
+            errors += failed
+            routes[route] = {
+                'requests': len(samples),
+                'errors': failed,
+                'error_rate': round(failed / len(samples), 4) if samples else 0.0,
+                'throughput_rps': round(len(samples) / elapsed, 3) if elapsed else 0.0,
+                'mean_ms': round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+                'p50_ms': round(percentile(latencies, 50), 2),
+                'p95_ms': round(percentile(latencies, 95), 2),
+                'p99_ms': round(percentile(latencies, 99), 2),
+            }
+        return {
+            'elapsed_s': round(elapsed, 3),
+            'journeys': self.journeys,
+            'requests': total,
+            'errors': errors,
+            'error_rate': round(errors / total, 4) if total else 0.0,
+            'throughput_rps': round(total / elapsed, 3) if elapsed else 0.0,
+            'routes': routes,
+        }
+
+
+def run_journey(base_url, topics, recorder, timeout):
+    s = requests.Session()
+    username = 'lt_' + uuid.uuid4().hex[:12]
+    password = 'loadtest-pass'
+    topic = random.choice(topics)
+
+    steps = [
+        lambda: s.post(base_url + '/register', data={'username': username, 'password': password},
+                       allow_redirects=False, timeout=timeout),
+        lambda: s.post(base_url + '/login', data={'username': username, 'password': password},
+                       allow_redirects=False, timeout=timeout),
+        lambda: s.get(base_url + '/TutorialList', allow_redirects=False, timeout=timeout),
+        lambda: s.get(base_url + '/TopicContent/' + topic.replace(' ', '_'),
+                      allow_redirects=False, timeout=timeout),
+        lambda: s.get(base_url + '/Questions/' + topic, allow_redirects=False, timeout=timeout),
+        lambda: s.get(base_url + '/Result/' + ','.join(['answer'] * 10),
+                      allow_redirects=False, timeout=timeout),
+    ]
+
+    for (route, expected), step in zip(JOURNEY, steps):
+        start = time.perf_counter()
+        try:
+            ok = step().status_code == expected
+        except requests.RequestException:
+            ok = False
+        recorder.add(route, time.perf_counter() - start, ok)
+        if not ok:
+            # Later steps depend on the session built by earlier ones
+            return
+    recorder.journey_done()
+
+
+def user_loop(base_url, topics, recorder, deadline, iterations, timeout):
+    done = 0
+    while time.time() < deadline and (not iterations or done < iterations):
+        run_journey(base_url, topics, recorder, timeout)
+        done += 1
+
+
+def wait_for_app(base_url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(base_url + '/', timeout=2).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def start_gunicorn(args, stub_url, db_path):
+    env = dict(os.environ)
+    env['WIKI_BASE_URL'] = stub_url
+    env['DATABASE_URL'] = 'sqlite:///' + db_path
+    cmd = [
+        sys.executable, '-m', 'gunicorn',
+        '--workers', str(args.workers),
+        '--threads', str(args.threads),
+        '--worker-class', args.worker_class,
+        '--bind', f'{args.host}:{args.app_port}',
+        '--timeout', str(args.gunicorn_timeout),
+        'app:app',
+    ]
+    return subprocess.Popen(cmd, cwd=REPO_ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def compare(current, previous_path):
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = json.load(f)['report']
+    print(f"\nComparison with {previous_path}")
+    print(f"{'route':34} {'p50':>16} {'p95':>16} {'p99':>16} {'err%':>14}")
+    for route, cur in current['routes'].items():
+        prev = previous.get('routes', {}).get(route)
+        if not prev:
+            continue
+        cells = [f"{prev[k]:7.1f}->{cur[k]:7.1f}" for k in ('p50_ms', 'p95_ms', 'p99_ms')]
+        err = f"{prev['error_rate'] * 100:5.1f}->{cur['error_rate'] * 100:5.1f}"
+        print(f"{route:34} {cells[0]:>16} {cells[1]:>16} {cells[2]:>16} {err:>14}")
+
+
+def print_report(report):
+    print(f"\n{report['journeys']} journeys, {report['requests']} requests in {report['elapsed_s']}s "
+          f"({report['throughput_rps']} req/s, {report['error_rate'] * 100:.2f}% errors)")
+    print(f"{'route':34} {'reqs':>6} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'err%':>7}")
+    for route, r in report['routes'].items():
+        print(f"{route:34} {r['requests']:6d} {r['throughput_rps']:8.2f} {r['p50_ms']:9.1f} "
+              f"{r['p95_ms']:9.1f} {r['p99_ms']:9.1f} {r['error_rate'] * 100:7.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='iQGenerator end-to-end load test')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--app-port', type=int, default=8000)
+    parser.add_argument('--stub-port', type=int, default=8081)
+    parser.add_argument('--base-url', default=None,
+                        help='Target an already running app instead of starting gunicorn')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--worker-class', default='sync')
+    parser.add_argument('--gunicorn-timeout', type=int, default=60)
+    parser.add_argument('--users', type=int, default=10, help='Concurrent simulated users')
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds to run')
+    parser.add_argument('--iterations', type=int, default=0, help='Journeys per user (0 = until duration)')
+    parser.add_argument('--request-timeout', type=float, default=60.0)
+    parser.add_argument('--stub-latency-ms', type=float, default=100)
+    parser.add_argument('--stub-jitter-ms', type=float, default=50)
+    parser.add_argument('--stub-error-rate', type=float, default=0.0)
+    parser.add_argument('--stub-timeout-rate', type=float, default=0.0)
+    parser.add_argument('--recordings', default=wiki_stub.RECORDINGS_DIR)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', default=None, help='Result JSON path')
+    parser.add_argument('--compare', default=None, help='Previous result JSON to compare against')
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    topics = load_topics()
+    stub = wiki_stub.start_in_thread(args.host, args.stub_port, wiki_stub.StubConfig(
+        args.recordings, args.stub_latency_ms, args.stub_jitter_ms,
+        args.stub_error_rate, args.stub_timeout_rate, seed=args.seed))
+    stub_url = f'http://{args.host}:{args.stub_port}/wiki/'
+
+    gunicorn = None
+    db_file = None
+    base_url = args.base_url
+    try:
+        if not base_url:
+            fd, db_file = tempfile.mkstemp(suffix='.db', prefix='iqg-loadtest-')
+            os.close(fd)
+            gunicorn = start_gunicorn(args, stub_url, db_file)
+            base_url = f'http://{args.host}:{args.app_port}'
+            if not wait_for_app(base_url):
+                print('App did not become ready under gunicorn.')
+                return 1
+
+        print(f"Running {args.users} users against {base_url} (stub at {stub_url})")
+        recorder = Recorder()
+        start = time.time()
+        deadline = start + args.duration
+        users = [threading.Thread(target=user_loop,
+                                  args=(base_url, topics, recorder, deadline, args.iterations,
+                                        args.request_timeout))
+                 for _ in range(args.users)]
+        for t in users:
+            t.start()
+        for t in users:
+            t.join()
+        report = recorder.report(time.time() - start)
+    finally:
+        if gunicorn:
+            gunicorn.send_signal(signal.SIGTERM)
+            try:
+                gunicorn.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                gunicorn.kill()
+        stub.shutdown()
+        if db_file and os.path.exists(db_file):
+            os.remove(db_file)
+
+    print_report(report)
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, time.strftime('run-%Y%m%d-%H%M%S.json'))
+    config = {k: v for k, v in vars(args).items() if k not in ('output', 'compare')}
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'config': config, 'report': report}, f, indent=2)
+    print(f"\nSaved results to {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
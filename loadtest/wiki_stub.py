@@ -0,0 +1,190 @@
+"""
+Local Wikipedia stub server for load testing.
+
+Serves recorded article HTML from a directory (one ``<Title>.html`` file per
+article) with configurable latency and failure injection, so the app can be
+pointed at it through the ``WIKI_BASE_URL`` environment variable instead of
+hammering the real Wikipedia.
+
+    python loadtest/wiki_stub.py --port 8081 --latency-ms 150 --error-rate 0.02
+    python loadtest/wiki_stub.py record "Linear Regression" "Decision Tree"
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+from urllib.parse import unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+RECORDINGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recordings')
+WIKIPEDIA_URL = 'https://en.wikipedia.org/wiki/'
+WIKI_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+}
+
+SYNTHETIC_SECTIONS = [
+    ("Overview", [
+        "{topic} is a widely studied method in machine learning and artificial intelligence.",
+        "Researchers apply {topic} to classification, regression and pattern recognition problems.",
+        "The training data for {topic} is usually split into a training set and a validation set.",
+        "Early work on {topic} was published by statisticians and computer scientists in the twentieth century.",
+    ]),
+    ("Algorithm", [
+        "The algorithm behind {topic} iteratively updates model parameters to reduce a loss function.",
+        "Gradient descent is frequently used to optimize the objective of {topic}.",
+        "Regularization helps {topic} avoid overfitting when the number of features is large.",
+        "Hyperparameter tuning with cross-validation improves the generalization of {topic}.",
+    ]),
+    ("Applications", [
+        "Practitioners use {topic} in computer vision, natural language processing and robotics.",
+        "Financial institutions rely on {topic} for credit scoring and fraud detection.",
+        "Medical researchers evaluate {topic} for diagnosis from imaging and clinical data.",
+        "Recommendation systems combine {topic} with feature selection and data preprocessing.",
+    ]),
+]
+
+
+def title_to_filename(title: str) -> str:
+    return unquote(title).replace(' ', '_').lower() + '.html'
+
+
+def synthetic_article(title: str) -> str:
+    """Build a Wikipedia-shaped page for topics that have no recording."""
+    topic = unquote(title).replace('_', ' ')
+    parts = ['<html><head><title>%s - Wikipedia</title></head><body>' % topic,
+             '<div class="mw-body"><h1>%s</h1>' % topic]
+    for heading, sentences in SYNTHETIC_SECTIONS:
+        parts.append('<h2>%s</h2>' % heading)
+        for sentence in sentences:
+            parts.append('<p>%s</p>' % sentence.format(topic=topic))
+    parts.append('</div></body></html>')
+    return '\n'.join(parts)
+
+
+class StubConfig:
+    def __init__(self, recordings_dir=RECORDINGS_DIR, latency_ms=0, jitter_ms=0,
+                 error_rate=0.0, timeout_rate=0.0, timeout_ms=30000, seed=None):
+        self.recordings_dir = recordings_dir
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_ms = timeout_ms
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.cache = {}
+
+    def roll(self) -> float:
+        with self.lock:
+            return self.rng.random()
+
+    def delay(self) -> float:
+        with self.lock:
+            jitter = self.rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+        return max(0.0, self.latency_ms + jitter) / 1000.0
+
+    def article(self, title: str) -> str:
+        filename = title_to_filename(title)
+        if filename not in self.cache:
+            path = os.path.join(self.recordings_dir, filename)
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.cache[filename] = f.read()
+            else:
+                self.cache[filename] = synthetic_article(title)
+        return self.cache[filename]
+
+
+class WikiStubHandler(BaseHTTPRequestHandler):
+    config = StubConfig()
+
+    def do_GET(self):
+        config = self.config
+        if not self.path.startswith('/wiki/'):
+            self.send_error(404)
+            return
+
+        time.sleep(config.delay())
+        roll = config.roll()
+        if roll < config.timeout_rate:
+            # Hold the connection long enough for the client timeout to fire
+            time.sleep(config.timeout_ms / 1000.0)
+            self.send_error(504)
+            return
+        if roll < config.timeout_rate + config.error_rate:
+            self.send_error(503, 'Injected failure')
+            return
+
+        body = config.article(self.path[len('/wiki/'):].split('?')[0]).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host='127.0.0.1', port=8081, config=None):
+    handler = type('ConfiguredWikiStubHandler', (WikiStubHandler,), {'config': config or StubConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(host='127.0.0.1', port=8081, config=None):
+    """Start the stub on a daemon thread and return the server."""
+    server = make_server(host, port, config)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def record(titles, recordings_dir=RECORDINGS_DIR):
+    """Fetch real articles once and store them for later replay."""
+    os.makedirs(recordings_dir, exist_ok=True)
+    for title in titles:
+        r = requests.get(WIKIPEDIA_URL + title.replace(' ', '_'), headers=WIKI_HEADERS, timeout=30)
+        r.raise_for_status()
+        path = os.path.join(recordings_dir, title_to_filename(title))
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(r.text)
+        print(f"Recorded {title} -> {path}")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'record':
+        record(argv[1:])
+        return
+
+    parser = argparse.ArgumentParser(description='Local Wikipedia stub server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--recordings', default=RECORDINGS_DIR)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--timeout-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    config = StubConfig(args.recordings, args.latency_ms, args.jitter_ms,
+                        args.error_rate, args.timeout_rate, seed=args.seed)
+    server = make_server(args.host, args.port, config)
+    print(f"Wikipedia stub listening on http://{args.host}:{args.port}/wiki/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""
+Near-duplicate detection with MinHash signatures and LSH banding.
+
+Texts are normalised and exact duplicates dropped first. The remaining
+texts are reduced to character shingles, hashed in one vectorized pass per
+batch of texts, and summarised by ``num_perm`` MinHash values computed in NumPy.
+Signatures are split into bands; only texts sharing a band bucket are
+compared, by their estimated Jaccard similarity. Small inputs skip LSH and
+compare exact shingle sets instead.
+"""
+import re
+import time
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+_MASK32 = np.uint64(0xFFFFFFFF)
+_SHIFT32 = np.uint64(32)
+_BASE = np.uint64(1000003)
+
+# Shingles processed per block, bounds the (num_perm x shingles) work array
+BLOCK_SHINGLES = 16384
+# Texts signed per step of dedup_indices, between deadline checks
+DEDUP_BATCH = 2048
+# At most this many distinct texts are compared pairwise on exact shingle sets
+SMALL_INPUT = 32
+
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+_SPACES_RE = re.compile(r'\s+')
+
+
+def _normalize(text: str) -> str:
+    return _SPACES_RE.sub(' ', _NON_WORD_RE.sub(' ', text.lower())).strip()
+
+
+class MinHasher:
+    """
+    MinHash signatures over character k-shingles
+    """
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: ((a * x + b) mod 2^64) >> 32, a odd
+        self.a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+        self.powers = _BASE ** np.arange(shingle_size - 1, -1, -1, dtype=np.uint64)
+
+    def batch_shingle_hashes(self, normalized: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        32-bit shingle hashes of already normalised texts as ``(hashes, offsets)``;
+        text ``i`` owns ``hashes[offsets[i]:offsets[i + 1]]``. Repeated shingles
+        are kept, they do not change a MinHash.
+        """
+        k = self.shingle_size
+        # Texts shorter than a shingle are zero-padded to exactly one
+        encoded = [t.encode('utf-8').ljust(k, b'\0') for t in normalized]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        data = np.frombuffer(b''.join(encoded), dtype=np.uint8).astype(np.uint64)
+        m = data.size - k + 1
+        hashes = np.zeros(m, dtype=np.uint64)
+        for j in range(k):
+            hashes += data[j:j + m] * self.powers[j]
+        hashes &= _MASK32
+
+        # Keep the windows that lie inside one text
+        owner = np.repeat(np.arange(len(encoded)), lengths)
+        inside = owner[:m] == owner[k - 1:]
+        offsets = np.searchsorted(owner[:m][inside], np.arange(len(encoded) + 1))
+        return hashes[inside], offsets
+
+    def shingle_hashes(self, text: str) -> np.ndarray:
+        """32-bit hashes of every character shingle, deduplicated."""
+        return np.unique(self.batch_shingle_hashes([_normalize(text)])[0])
+
+    def _sign(self, hashes: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+        out = np.empty((len(offsets) - 1, self.num_perm), dtype=np.uint32)
+        start = 0
+        while start < len(out):
+            # Group whole texts into one block and reduce per text with reduceat
+            end = int(np.searchsorted(offsets, offsets[start] + BLOCK_SHINGLES, side='right')) - 1
+            end = min(max(end, start + 1), len(out))
+            x = hashes[offsets[start]:offsets[end]]
+            hashed = np.multiply(self.a[:, None], x[None, :])
+            hashed += self.b[:, None]
+            hashed >>= _SHIFT32
+            out[start:end] = np.minimum.reduceat(hashed, offsets[start:end] - offsets[start], axis=1).T
+            start = end
+        return out
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """(len(texts), num_perm) uint32 signature matrix."""
+        return self._sign(*self.batch_shingle_hashes([_normalize(t) for t in texts]))
+
+
+def _dedup_small(normalized: Sequence[str], threshold: float, hasher: MinHasher) -> List[int]:
+    """Pairwise exact Jaccard over shingle sets, for a handful of texts."""
+    hashes, offsets = hasher.batch_shingle_hashes(normalized)
+    kept, kept_sets = [], []
+    for i in range(len(normalized)):
+        shingles = set(hashes[offsets[i]:offsets[i + 1]].tolist())
+        if any(len(shingles & other) >= threshold * len(shingles | other) for other in kept_sets):
+            continue
+        kept.append(i)
+        kept_sets.append(shingles)
+    return kept
+
+
+def dedup_indices(texts: Sequence[str], threshold: float = 0.7, bands: int = 16,
+                  hasher: MinHasher = None, deadline: float = None) -> List[int]:
+    """
+    Indices of ``texts`` to keep, dropping any text whose estimated Jaccard
+    similarity to an earlier kept text is at least ``threshold``. Once
+    ``deadline`` (a time.monotonic() value) passes, the remaining texts are
+    kept unchecked.
+    """
+    if len(texts) < 2:
+        return list(range(len(texts)))
+    hasher = hasher or MinHasher()
+
+    # Exact duplicates (after normalisation) never need signing
+    first = {}
+    for i, text in enumerate(texts):
+        first.setdefault(_normalize(text), i)
+    normalized = list(first)
+    index = list(first.values())
+    if len(normalized) <= SMALL_INPUT:
+        return [index[i] for i in _dedup_small(normalized, threshold, hasher)]
+
+    sigs = np.empty((len(normalized), hasher.num_perm), dtype=np.uint32)
+    signed = 0
+    while signed < len(normalized):
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        batch = normalized[signed:signed + DEDUP_BATCH]
+        sigs[signed:signed + len(batch)] = hasher._sign(*hasher.batch_shingle_hashes(batch))
+        signed += len(batch)
+
+    rows = hasher.num_perm // bands
+    # Collapse each band to one 64-bit key; collisions are caught by the Jaccard check
+    mult = np.random.default_rng(0).integers(1, 2 ** 63, size=rows, dtype=np.uint64)
+    band_keys = (sigs[:signed, :bands * rows].reshape(signed, bands, rows).astype(np.uint64) * mult).sum(axis=2)
+
+    # Only texts sharing a bucket with another text in some band can be dropped
+    shared = np.zeros(signed, dtype=bool)
+    for band in range(bands):
+        _, inverse, counts = np.unique(band_keys[:, band], return_inverse=True, return_counts=True)
+        shared |= counts[inverse] > 1
+
+    dropped = set()
+    buckets = [dict() for _ in range(bands)]
+    for i in np.flatnonzero(shared).tolist():
+        keys = band_keys[i].tolist()
+        candidates = set()
+        for band, key in enumerate(keys):
+            candidates.update(buckets[band].get(key, ()))
+        if candidates:
+            similarity = (sigs[list(candidates)] == sigs[i]).mean(axis=1)
+            if similarity.max() >= threshold:
+                dropped.add(i)
+                continue
+        for band, key in enumerate(keys):
+            buckets[band].setdefault(key, []).append(i)
+    return [index[i] for i in range(len(normalized)) if i not in dropped]
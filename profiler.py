@@ -0,0 +1,259 @@
+"""
+Opt-in request profiler.
+
+When enabled through ``PROFILER_ENABLED`` (or per request with an
+``X-Profile-Token`` header signed with ``PROFILER_SECRET``) a fraction of requests run under cProfile and every
+profiled request is watched by a low-rate stack sampler. Requests that were
+sampled, forced by the header, or slower than ``PROFILER_SLOW_MS`` are kept in
+a bounded buffer of the N slowest profiles, available as pstats dumps or
+collapsed stacks for flamegraph tools.
+
+With profiling off the only per-request cost is a flag check and a header
+lookup. Without ``PROFILER_SECRET`` tokens are never accepted.
+"""
+import sys
+import time
+import heapq
+import random
+import marshal
+import cProfile
+import itertools
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from flask import g, request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+TOKEN_HEADER = 'X-Profile-Token'
+TOKEN_SALT = 'iqg-profiler'
+
+
+class StackSampler:
+    """
+    Background thread sampling the stacks of registered request threads
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.lock = threading.Lock()
+        # Signalled when a thread registers; the sampler sleeps on it while idle
+        self.wakeup = threading.Condition(self.lock)
+        self.active = {}
+        self.thread = None
+
+    def register(self, thread_id: int) -> Counter:
+        stacks = Counter()
+        with self.lock:
+            self.active[thread_id] = stacks
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name='profiler-sampler', daemon=True)
+                self.thread.start()
+            self.wakeup.notify()
+        return stacks
+
+    def unregister(self, thread_id: int):
+        with self.lock:
+            self.active.pop(thread_id, None)
+
+    def _run(self):
+        while True:
+            with self.lock:
+                while not self.active:
+                    self.wakeup.wait()
+            time.sleep(self.interval)
+            with self.lock:
+                frames = sys._current_frames()
+                for thread_id, stacks in self.active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        stacks[self._collapse(frame)] += 1
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            parts.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+        parts.reverse()
+        return ';'.join(parts)
+
+
+class RequestProfiler:
+    """
+    Flask extension that captures profiles of sampled and slow requests
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.sample_rate = 0.0
+        self.slow_ms = 1000.0
+        self.max_profiles = 20
+        self.serializer = None
+        self.token_max_age = 3600
+        self.sampler = StackSampler()
+        self.lock = threading.Lock()
+        self.profiles = []
+        self.counter = itertools.count(1)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PROFILER_ENABLED', False)
+        app.config.setdefault('PROFILER_SAMPLE_RATE', 0.01)
+        app.config.setdefault('PROFILER_SLOW_MS', 1000)
+        app.config.setdefault('PROFILER_MAX_PROFILES', 20)
+        app.config.setdefault('PROFILER_SAMPLE_INTERVAL_MS', 5)
+        app.config.setdefault('PROFILER_TOKEN_MAX_AGE', 3600)
+        app.config.setdefault('PROFILER_SECRET', None)
+
+        self.enabled = bool(app.config['PROFILER_ENABLED'])
+        self.sample_rate = float(app.config['PROFILER_SAMPLE_RATE'])
+        self.slow_ms = float(app.config['PROFILER_SLOW_MS'])
+        self.max_profiles = int(app.config['PROFILER_MAX_PROFILES'])
+        self.sampler.interval = app.config['PROFILER_SAMPLE_INTERVAL_MS'] / 1000.0
+        self.token_max_age = int(app.config['PROFILER_TOKEN_MAX_AGE'])
+        # A dedicated secret: SECRET_KEY may be a public default
+        secret = app.config['PROFILER_SECRET']
+        self.serializer = URLSafeTimedSerializer(secret, salt=TOKEN_SALT) if secret else None
+
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+        app.extensions['profiler'] = self
+
+    ############################################################
+    # Admin tokens
+    ############################################################
+    @property
+    def tokens_enabled(self) -> bool:
+        return self.serializer is not None
+
+    def make_token(self, subject: str = 'admin') -> str:
+        if self.serializer is None:
+            raise RuntimeError("PROFILER_SECRET is not set")
+        return self.serializer.dumps({'sub': subject})
+
+    def verify_token(self, token: Optional[str]) -> bool:
+        if not token or self.serializer is None:
+            return False
+        try:
+            self.serializer.loads(token, max_age=self.token_max_age)
+            return True
+        except BadSignature:
+            return False
+
+    def is_admin_request(self) -> bool:
+        return self.verify_token(request.headers.get(TOKEN_HEADER) or request.args.get('token'))
+
+    ############################################################
+    # Request hooks
+    ############################################################
+    def _before_request(self):
+        token = request.headers.get(TOKEN_HEADER) if self.serializer is not None else None
+        if not self.enabled and token is None:
+            return
+        forced = token is not None and self.verify_token(token)
+        if not self.enabled and not forced:
+            return
+
+        thread_id = threading.get_ident()
+        state = {
+            'start': time.perf_counter(),
+            'thread_id': thread_id,
+            'stacks': self.sampler.register(thread_id),
+            'reason': 'forced' if forced else None,
+            'profile': None,
+        }
+        if forced or random.random() < self.sample_rate:
+            state['reason'] = state['reason'] or 'sampled'
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+                state['profile'] = profile
+            except ValueError:
+                # Another profiler is already active on this interpreter
+                pass
+        g._profiler_state = state
+
+    def _teardown_request(self, exc=None):
+        state = g.pop('_profiler_state', None)
+        if state is None:
+            return
+        duration_ms = (time.perf_counter() - state['start']) * 1000.0
+        profile = state['profile']
+        if profile is not None:
+            profile.disable()
+        self.sampler.unregister(state['thread_id'])
+        # Safe to read once unregistered: the sampler only writes under its lock
+
+        reason = state['reason']
+        if reason is None and duration_ms >= self.slow_ms:
+            reason = 'slow'
+        if reason is None:
+            return
+
+        stats = None
+        if profile is not None:
+            profile.create_stats()
+            stats = profile.stats
+        self._record({
+            'method': request.method,
+            'path': request.path,
+            'status': 'error' if exc is not None else 'ok',
+            'duration_ms': round(duration_ms, 2),
+            'timestamp': time.time(),
+            'reason': reason,
+            'stats': stats,
+            'stacks': dict(state['stacks']),
+        })
+
+    def _record(self, entry: Dict[str, Any]):
+        with self.lock:
+            entry['id'] = next(self.counter)
+            item = (entry['duration_ms'], entry['id'], entry)
+            if len(self.profiles) < self.max_profiles:
+                heapq.heappush(self.profiles, item)
+            elif item[0] > self.profiles[0][0]:
+                heapq.heapreplace(self.profiles, item)
+
+    ############################################################
+    # Access
+    ############################################################
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            entries = [item[2] for item in self.profiles]
+        entries.sort(key=lambda e: e['duration_ms'], reverse=True)
+        return [{
+            'id': e['id'],
+            'method': e['method'],
+            'path': e['path'],
+            'status': e['status'],
+            'duration_ms': e['duration_ms'],
+            'timestamp': e['timestamp'],
+            'reason': e['reason'],
+            'has_pstats': e['stats'] is not None,
+            'samples': sum(e['stacks'].values()),
+        } for e in entries]
+
+    def get_profile(self, profile_id: int) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            for _, pid, entry in self.profiles:
+                if pid == profile_id:
+                    return entry
+        return None
+
+    def pstats_bytes(self, profile_id: int) -> Optional[bytes]:
+        """Profile in the marshal format read by ``pstats.Stats``."""
+        entry = self.get_profile(profile_id)
+        if not entry or entry['stats'] is None:
+            return None
+        return marshal.dumps(entry['stats'])
+
+    def collapsed(self, profile_id: int) -> Optional[str]:
+        """Samples in collapsed-stack format (``frame;frame;frame count``)."""
+        entry = self.get_profile(profile_id)
+        if not entry:
+            return None
+        lines = [f"{stack} {count}" for stack, count in sorted(entry['stacks'].items())]
+        return '\n'.join(lines) + ('\n' if lines else '')
@@ -0,0 +1,183 @@
+"""
+Randomized exam variants from one generated question pool.
+
+All question and option permutations for ``n`` variants are drawn in one
+batch with NumPy, together with each variant's answer key. Variants are then
+rendered one at a time, so the JSON and DOCX writers never hold more than a
+single rendered variant in memory.
+"""
+import io
+import re
+import json
+import zipfile
+from xml.sax.saxutils import escape
+from typing import Any, BinaryIO, Dict, Iterator, List, Sequence, TextIO
+
+import numpy as np
+
+LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+MAX_VARIANTS = 500
+# DOCX rendering cost per question per variant: measured at ~1.1 ms (500 ten-question
+# variants in ~5.6 s), plus headroom for slower hosts and longer questions
+DOCX_SECONDS_PER_QUESTION = 0.002
+
+
+class VariantPlan:
+    """
+    Seeded permutations for ``n`` variants of ``pool``
+
+    ``question_order[v]`` is the order of pool questions in variant ``v``,
+    ``option_order[v, i]`` the option order of its ``i``-th question and
+    ``key[v, i]`` the index of the correct option after shuffling.
+    """
+
+    def __init__(self, pool: Sequence[Dict[str, Any]], n: int, seed: int = 0):
+        if not pool:
+            raise ValueError("Question pool is empty")
+        self.pool = list(pool)
+        self.n = n
+        self.seed = seed
+        q = len(self.pool)
+        k = max(len(p.get('Options', [])) for p in self.pool)
+        option_counts = np.array([len(p.get('Options', [])) for p in self.pool])
+        correct = np.array([self._correct_index(p) for p in self.pool])
+
+        rng = np.random.default_rng(seed)
+        self.question_order = np.argsort(rng.random((n, q)), axis=1)
+
+        # Padding slots sort last, so each row starts with a permutation of the real options
+        keys = rng.random((n, q, k))
+        counts = option_counts[self.question_order]
+        keys[np.arange(k)[None, None, :] >= counts[:, :, None]] = 2.0
+        self.option_order = np.argsort(keys, axis=2)
+        self.option_counts = counts
+
+        target = correct[self.question_order]
+        self.key = np.argmax(self.option_order == target[:, :, None], axis=2)
+
+    @staticmethod
+    def _correct_index(question: Dict[str, Any]) -> int:
+        options = question.get('Options', [])
+        try:
+            return options.index(question.get('Answer'))
+        except ValueError:
+            raise ValueError(f"Answer not among options: {question.get('Question', '')!r}")
+
+    def variant(self, v: int) -> Dict[str, Any]:
+        questions = []
+        answer_key = []
+        for i, src in enumerate(self.question_order[v]):
+            q = self.pool[src]
+            order = self.option_order[v, i, :self.option_counts[v, i]]
+            letter = LETTERS[self.key[v, i]]
+            questions.append({
+                "Question": q["Question"],
+                "Options": [q["Options"][j] for j in order],
+                "Answer": q["Answer"],
+            })
+            answer_key.append(letter)
+        return {"variant": v + 1, "seed": self.seed, "quiz": questions, "key": answer_key}
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for v in range(self.n):
+            yield self.variant(v)
+
+    def answer_keys(self) -> List[str]:
+        """Compact key per variant, e.g. ``'BADC...'``."""
+        return [''.join(LETTERS[i] for i in row) for row in self.key]
+
+
+def grade(plan: VariantPlan, variant: int, letters: Sequence[str]) -> int:
+    """Number of correct answers for a variant given the chosen letters."""
+    expected = plan.key[variant - 1]
+    return sum(1 for exp, got in zip(expected, letters) if got and LETTERS[exp] == got.upper())
+
+
+def iter_json(plan: VariantPlan) -> Iterator[str]:
+    """JSON document in chunks, one variant per chunk."""
+    yield '{"seed": %d, "count": %d, "variants": [\n' % (plan.seed, plan.n)
+    for v, variant in enumerate(plan):
+        yield (',\n' if v else '') + json.dumps(variant, ensure_ascii=False)
+    yield '\n]}\n'
+
+
+def write_json(plan: VariantPlan, fp: TextIO):
+    for chunk in iter_json(plan):
+        fp.write(chunk)
+
+
+DOCUMENT_PART = 'word/document.xml'
+# Characters XML 1.0 cannot carry; PDF extraction sometimes produces them
+_INVALID_XML_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+_template = None
+
+
+def _template_parts():
+    """
+    Parts of python-docx's default template, loaded once per process, with
+    ``word/document.xml`` split around its (empty) body content.
+    """
+    global _template
+    if _template is None:
+        from docx import Document
+
+        buf = io.BytesIO()
+        Document().save(buf)
+        with zipfile.ZipFile(buf) as zf:
+            parts = [(name, zf.read(name)) for name in zf.namelist()]
+        xml = dict(parts)[DOCUMENT_PART].decode('utf-8')
+        body = xml.index('<w:body>') + len('<w:body>')
+        sect = xml.index('<w:sectPr', body)
+        _template = ([p for p in parts if p[0] != DOCUMENT_PART], xml[:body], xml[sect:])
+    return _template
+
+
+def _paragraph(text: str, bold: bool = False, indent: bool = False) -> str:
+    text = escape(_INVALID_XML_RE.sub('', text))
+    ppr = '<w:pPr><w:ind w:left="360"/></w:pPr>' if indent else ''
+    rpr = '<w:rPr><w:b/></w:rPr>' if bold else ''
+    return f'<w:p>{ppr}<w:r>{rpr}<w:t xml:space="preserve">{text}</w:t></w:r></w:p>'
+
+
+def _build_docx(paragraphs: List[str]) -> bytes:
+    """DOCX bytes from the shared template with ``paragraphs`` as the body."""
+    parts, head, tail = _template_parts()
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name, data in parts:
+            zf.writestr(name, data)
+        zf.writestr(DOCUMENT_PART, head + ''.join(paragraphs) + tail)
+    return buf.getvalue()
+
+
+def _render_docx(variant: Dict[str, Any], title: str) -> bytes:
+    paragraphs = [_paragraph(f"{title} - Variant {variant['variant']}", bold=True)]
+    for i, q in enumerate(variant['quiz'], 1):
+        paragraphs.append(_paragraph(f"{i}. {q['Question']}"))
+        for j, option in enumerate(q['Options']):
+            paragraphs.append(_paragraph(f"{LETTERS[j]}) {option}", indent=True))
+    return _build_docx(paragraphs)
+
+
+def _render_key_docx(plan: VariantPlan, title: str) -> bytes:
+    paragraphs = [_paragraph(f"{title} - Answer Keys", bold=True)]
+    for v, key in enumerate(plan.answer_keys(), 1):
+        answers = ' '.join(f"{i}{letter}" for i, letter in enumerate(key, 1))
+        paragraphs.append(_paragraph(f"Variant {v}: {answers}"))
+    return _build_docx(paragraphs)
+
+
+def docx_variant_limit(pool_size: int, seconds: float) -> int:
+    """Largest number of variants whose DOCX export fits in ``seconds``."""
+    return int(seconds / (DOCX_SECONDS_PER_QUESTION * max(pool_size, 1)))
+
+
+def write_docx_zip(plan: VariantPlan, fp: BinaryIO, title: str = 'Quiz'):
+    """Zip of one DOCX per variant plus an answer-key DOCX, rendered one by one."""
+    # DOCX files are already deflated; storing them avoids compressing twice
+    with zipfile.ZipFile(fp, 'w', zipfile.ZIP_STORED) as zf:
+        width = len(str(plan.n))
+        for variant in plan:
+            name = f"variant-{variant['variant']:0{width}d}.docx"
+            zf.writestr(name, _render_docx(variant, title))
+        zf.writestr('answer-keys.docx', _render_key_docx(plan, title))